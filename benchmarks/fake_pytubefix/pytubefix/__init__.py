@@ -0,0 +1,180 @@
+"""Offline stand-in for pytubefix used by the benchmark harness (benchmarks/run.py).
+
+Channels, videos and streams are generated from the scenario file named by the YTDLA_BENCH_SCENARIO
+environment variable, stream URLs point to the local media server of the harness. Only the parts of the
+pytubefix API that YTDLa uses are provided. With "upload_every" in the scenario a new video appears on top
+of the channel every that many seconds, up to "new_uploads" videos.
+"""
+import json
+import os
+import re
+import shutil
+import time
+import urllib.request
+from datetime import datetime, timedelta
+
+with open(os.environ["YTDLA_BENCH_SCENARIO"], "r", encoding="utf-8") as scenario_file:
+    SCENARIO = json.load(scenario_file)
+
+CHANNEL_URL = "https://www.youtube.com/@benchmark"
+CHANNEL_PAGE_SIZE = 30
+STARTED = time.monotonic()
+
+
+def uploaded_since_start() -> int:
+    if not SCENARIO.get("upload_every"):
+        return 0
+    return min(SCENARIO["new_uploads"], int((time.monotonic() - STARTED) / SCENARIO["upload_every"]))
+
+
+def video_id_for(index: int) -> str:
+    # uploads made while running get negative indices, they are newer than all others
+    return f"v{index:010d}"
+
+
+def index_for(video_id: str) -> int:
+    return int(video_id[1:])
+
+
+def video_id_from_url(url: str) -> str:
+    match = re.search(r"(?:v=|/)([0-9A-Za-z_-]{11})(?:[?&]|$)", url)
+    return match.group(1) if match else url[-11:]
+
+
+class Stream:
+    def __init__(self, spec: dict, youtube):
+        self.itag = spec["itag"]
+        self.type = spec["type"]
+        self.subtype = spec["subtype"]
+        self.mime_type = f"{self.type}/{self.subtype}"
+        self.resolution = spec.get("resolution")
+        self.fps = spec.get("fps", 0)
+        self.abr = spec.get("abr")
+        self.bitrate = spec.get("bitrate", 0)
+        self.video_codec = spec.get("video_codec")
+        self.audio_codec = spec.get("audio_codec")
+        self.includes_video_track = self.type == "video"
+        self.includes_audio_track = self.type == "audio"
+        self.is_default_audio_track = True
+        self.is_sabr = False
+        self.filesize = spec["filesize"]
+        self.url = SCENARIO["server"] + "/media/" + spec["file"] + "?v=" + youtube.video_id
+        self._youtube = youtube
+
+    def download(self, output_path: str = None, filename: str = None, skip_existing: bool = True) -> str:
+        file_path = os.path.join(output_path or ".", filename or os.path.basename(self.url.split("?")[0]))
+        with urllib.request.urlopen(self.url) as response, open(file_path, "wb") as file:
+            shutil.copyfileobj(response, file)
+        return file_path
+
+    def __repr__(self) -> str:
+        if self.type == "video":
+            return (f'<Stream: itag="{self.itag}" mime_type="{self.mime_type}" res="{self.resolution}" '
+                    f'fps="{self.fps}fps" vcodec="{self.video_codec}" progressive="False" type="video">')
+        return (f'<Stream: itag="{self.itag}" mime_type="{self.mime_type}" abr="{self.abr}" '
+                f'acodec="{self.audio_codec}" progressive="False" type="audio">')
+
+
+class StreamQuery(list):
+    def filter(self, type=None, only_audio=False, only_video=False, file_extension=None, **kwargs):
+        streams = list(self)
+        if type is not None:
+            streams = [stream for stream in streams if stream.type == type]
+        if only_audio:
+            streams = [stream for stream in streams if stream.type == "audio"]
+        if only_video:
+            streams = [stream for stream in streams if stream.type == "video"]
+        if file_extension is not None:
+            streams = [stream for stream in streams if stream.subtype == file_extension]
+        return StreamQuery(streams)
+
+
+class YouTube:
+    """A video of the benchmark channel, the first metadata access costs the configured latency."""
+
+    def __init__(self, url: str, *args, **kwargs):
+        self.video_id = video_id_from_url(url)
+        self.watch_url = "https://www.youtube.com/watch?v=" + self.video_id
+        self._index = index_for(self.video_id)
+        self._fetched = False
+        self._progress_callback = None
+
+    def _fetch(self) -> None:
+        if not self._fetched:
+            time.sleep(SCENARIO["metadata_latency"])
+            self._fetched = True
+
+    @property
+    def title(self) -> str:
+        self._fetch()
+        return f"{SCENARIO['title_prefix']} {self._index:07d}"
+
+    @property
+    def length(self) -> int:
+        self._fetch()
+        return SCENARIO["length"]
+
+    @property
+    def views(self) -> int:
+        self._fetch()
+        return 1000 + self._index
+
+    @property
+    def publish_date(self) -> datetime:
+        self._fetch()
+        return datetime(2025, 1, 1) - timedelta(days=self._index)
+
+    @property
+    def age_restricted(self) -> bool:
+        self._fetch()
+        return False
+
+    @property
+    def vid_info(self) -> dict:
+        self._fetch()
+        return {"playabilityStatus": {"status": "OK"}}
+
+    @property
+    def channel_url(self) -> str:
+        return CHANNEL_URL
+
+    @property
+    def streams(self) -> StreamQuery:
+        self._fetch()
+        return StreamQuery(Stream(spec, self) for spec in SCENARIO["streams"])
+
+    def register_on_progress_callback(self, func) -> None:
+        self._progress_callback = func
+
+
+class Channel:
+    """The benchmark channel, uploads are listed newest first in pages with the configured latency."""
+
+    def __init__(self, url: str, *args, **kwargs):
+        self.channel_url = CHANNEL_URL
+        self.channel_name = SCENARIO["channel_name"]
+
+    def videos_generator(self):
+        new_uploads = uploaded_since_start()
+        for position, index in enumerate(range(-new_uploads, SCENARIO["channel_size"])):
+            if position % CHANNEL_PAGE_SIZE == 0:
+                time.sleep(SCENARIO["page_latency"])
+            yield YouTube(video_id_for(index))
+
+    @property
+    def video_urls(self):
+        return self.videos_generator()
+
+    @property
+    def videos(self):
+        return self.videos_generator()
+
+
+class Playlist:
+    def __init__(self, url: str, *args, **kwargs):
+        self.owner_url = CHANNEL_URL
+
+    @property
+    def video_urls(self) -> list[str]:
+        return ["https://www.youtube.com/watch?v=" + video_id_for(index)
+                for index in range(min(SCENARIO["channel_size"], 100))]
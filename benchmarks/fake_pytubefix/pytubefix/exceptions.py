@@ -0,0 +1,10 @@
+class PytubeFixError(Exception):
+    pass
+
+
+class VideoUnavailable(PytubeFixError):
+    pass
+
+
+class BotDetection(VideoUnavailable):
+    pass
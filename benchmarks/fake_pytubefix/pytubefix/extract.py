@@ -0,0 +1,5 @@
+from pytubefix import video_id_from_url
+
+
+def video_id(url: str) -> str:
+    return video_id_from_url(url)
@@ -0,0 +1,419 @@
+"""Offline benchmarks for YTDLa.
+
+Runs YTDLa.py unchanged against a fake pytubefix (benchmarks/fake_pytubefix) whose streams are small
+ffmpeg-generated clips served by a local HTTP server with configurable latency and bandwidth. Every scenario
+runs in a fresh working directory and reports videos/min, MB/s served and the CPU time of YTDLa and ffmpeg.
+
+    python benchmarks/run.py                              all scenarios
+    python benchmarks/run.py archive-skip --scale 0.1     one scenario, a tenth of its channel size
+    python benchmarks/run.py --set max_parallel_downloads=4 --json after.json --baseline before.json
+
+With --baseline the run fails (exit code 1) if a scenario got slower than the baseline by more than --tolerance.
+"""
+import argparse
+import http.server
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+try:
+    import resource
+except ImportError:  # Windows, CPU time isn't reported
+    resource = None
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARK_DIR)
+MEDIA_DIR = os.path.join(BENCHMARK_DIR, ".media")
+FAKE_PYTUBEFIX_DIR = os.path.join(BENCHMARK_DIR, "fake_pytubefix")
+CHANNEL_URL = "https://www.youtube.com/@benchmark"
+CHANNEL_NAME = "Benchmark Channel"
+TITLE_PREFIX = "Benchmark"
+
+MEDIA = {
+    "video_360p": {
+        "file": "video_360p.mp4",
+        "seconds": 10,
+        "command": ["-f", "lavfi", "-i", "testsrc=size=640x360:rate=30", "-c:v", "libx264",
+                    "-preset", "ultrafast", "-pix_fmt", "yuv420p", "-an", "-movflags", "+faststart"],
+        "stream": {"itag": 134, "type": "video", "subtype": "mp4", "resolution": "360p", "fps": 30,
+                   "bitrate": 500000, "video_codec": "avc1.4d401e"}
+    },
+    "video_2160p_vp9": {
+        "file": "video_2160p.webm",
+        "seconds": 3,
+        "command": ["-f", "lavfi", "-i", "testsrc=size=3840x2160:rate=30", "-c:v", "libvpx-vp9",
+                    "-deadline", "realtime", "-cpu-used", "8", "-b:v", "8M", "-an"],
+        "stream": {"itag": 313, "type": "video", "subtype": "webm", "resolution": "2160p", "fps": 30,
+                   "bitrate": 8000000, "video_codec": "vp9"}
+    },
+    "audio": {
+        "file": "audio.m4a",
+        "seconds": 10,
+        "command": ["-f", "lavfi", "-i", "sine=frequency=440:sample_rate=44100", "-c:a", "aac",
+                    "-b:a", "128k"],
+        "stream": {"itag": 140, "type": "audio", "subtype": "mp4", "abr": "128kbps", "audio_codec": "mp4a.40.2"}
+    },
+    "audio_podcast": {
+        "file": "audio_podcast.m4a",
+        "seconds": 120,
+        "command": ["-f", "lavfi", "-i", "sine=frequency=220:sample_rate=44100", "-c:a", "aac",
+                    "-b:a", "128k"],
+        "stream": {"itag": 140, "type": "audio", "subtype": "mp4", "abr": "128kbps", "audio_codec": "mp4a.40.2"}
+    }
+}
+
+SCENARIOS = {
+    "archive-skip": {
+        "description": "10k-video channel, 95% already archived, the rest downloaded at 360p",
+        "channel_size": 10000,
+        "archived_every": 20,  # every 20th video is new
+        "audio_only": False,
+        "media": ["video_360p", "audio"]
+    },
+    "transcode-4k": {
+        "description": "vp9-only 2160p uploads, transcoded to H.264",
+        "channel_size": 5,
+        "archived_every": 0,
+        "audio_only": False,
+        "media": ["video_2160p_vp9", "audio"]
+    },
+    "mp3-backfill": {
+        "description": "podcast channel backfilled as MP3",
+        "channel_size": 200,
+        "archived_every": 0,
+        "audio_only": True,
+        "media": ["video_360p", "audio_podcast"]
+    },
+    "watch": {
+        "description": "watch mode on an archived channel that uploads 3 videos while it runs",
+        "channel_size": 1000,
+        "archived_every": 1000000,  # only the newest video is new
+        "audio_only": False,
+        "media": ["video_360p", "audio"],
+        "arguments": ["watch", "--interval", "0.01", "--polls", "10"],
+        "upload_every": 1.0,
+        "new_uploads": 3
+    },
+    "throttled": {
+        "description": "every 4th media request answered with HTTP 429, every 5th one slow, rate limit below 1/s",
+        "channel_size": 100,
+        "archived_every": 0,
+        "audio_only": False,
+        "media": ["video_360p", "audio"],
+        "throttle_every": 4,
+        "slow_every": 5,
+        "slow_seconds": 2.0,
+        "config": {"max_requests_per_second": "0.8"}
+    }
+}
+# a scenario that runs longer has hung (e.g. in the rate limiter) and counts as failed
+SCENARIO_TIMEOUT_SECONDS = 900
+
+
+class MediaHandler(http.server.BaseHTTPRequestHandler):
+    """Serves the clips in MEDIA_DIR with byte ranges, request latency and a per-connection bandwidth cap.
+
+    For the throttling scenarios every throttle_every-th request is answered with HTTP 429 and every
+    slow_every-th request waits slow_seconds longer.
+    """
+    protocol_version = "HTTP/1.1"
+    latency = 0.0
+    bandwidth = 0  # bytes per second, 0 = unlimited
+    throttle_every = 0  # 0 = never
+    slow_every = 0  # 0 = never
+    slow_seconds = 0.0
+    bytes_served = 0
+    requests_received = 0
+    requests_served = 0
+    requests_throttled = 0
+    counter_lock = threading.Lock()
+
+    def do_GET(self) -> None:
+        with MediaHandler.counter_lock:
+            MediaHandler.requests_received += 1
+            request_number = MediaHandler.requests_received
+        time.sleep(self.latency)
+        if self.slow_every and request_number % self.slow_every == 0:
+            time.sleep(self.slow_seconds)
+        if self.throttle_every and request_number % self.throttle_every == 0:
+            with MediaHandler.counter_lock:
+                MediaHandler.requests_throttled += 1
+            self.send_response(429)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        file_name = os.path.basename(self.path.split("?")[0])
+        file_path = os.path.join(MEDIA_DIR, file_name)
+        if not os.path.exists(file_path):
+            self.send_error(404)
+            return
+        file_size = os.path.getsize(file_path)
+        start, end = 0, file_size - 1
+        range_match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if range_match:
+            start = int(range_match.group(1))
+            end = min(end, int(range_match.group(2))) if range_match.group(2) else end
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{file_size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+
+        with open(file_path, "rb") as file:
+            file.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = file.read(min(65536, remaining))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                remaining -= len(chunk)
+                with MediaHandler.counter_lock:
+                    MediaHandler.bytes_served += len(chunk)
+                if self.bandwidth:
+                    time.sleep(len(chunk) / self.bandwidth)
+        with MediaHandler.counter_lock:
+            MediaHandler.requests_served += 1
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+def generate_media(names: list[str]) -> None:
+    """Creates the test clips with ffmpeg once, they are reused by later runs."""
+    os.makedirs(MEDIA_DIR, exist_ok=True)
+    for name in names:
+        file_path = os.path.join(MEDIA_DIR, MEDIA[name]["file"])
+        if not os.path.exists(file_path):
+            print(f"Generating {MEDIA[name]['file']}...")
+            subprocess.run(["ffmpeg", "-y", "-loglevel", "error", *MEDIA[name]["command"],
+                            "-t", str(MEDIA[name]["seconds"]), file_path], check=True)
+
+
+def media_length(names: list[str]) -> int:
+    """Length of the videos in the fake metadata: the longest clip, like the muxed output (checked by YTDLa)."""
+    return max(MEDIA[name]["seconds"] for name in names)
+
+
+def stream_specs(names: list[str]) -> list[dict]:
+    return [{**MEDIA[name]["stream"], "file": MEDIA[name]["file"],
+             "filesize": os.path.getsize(os.path.join(MEDIA_DIR, MEDIA[name]["file"]))} for name in names]
+
+
+def create_archive(channel_path: str, channel_size: int, archived_every: int) -> int:
+    """Creates empty archive files for all videos except every archived_every-th one."""
+    if archived_every <= 0:
+        return 0
+    os.makedirs(channel_path, exist_ok=True)
+    archived = 0
+    for index in range(channel_size):
+        if index % archived_every == 0:
+            continue
+        publish_date = (datetime(2025, 1, 1) - timedelta(days=index)).strftime("%Y-%m-%d")
+        file_name = f"{publish_date} - 360p - {TITLE_PREFIX} {index:07d} - v{index:010d}.mp4"
+        open(os.path.join(channel_path, file_name), "wb").close()
+        archived += 1
+    return archived
+
+
+def count_archived_files(channel_path: str) -> int:
+    count = 0
+    for root, _, files in os.walk(channel_path):
+        count += sum(1 for file in files if file.endswith((".mp4", ".mkv", ".mp3")))
+    return count
+
+
+def user_answers(audio_only: bool) -> str:
+    answers = [CHANNEL_URL,
+               "",  # download path
+               "a" if audio_only else "v"]
+    if not audio_only:
+        answers.append("")  # max. resolution
+    answers += ["", "", "", "", "", "", "", ""]  # duration, restricted, views, year folders, ids, filter words
+    answers.append("n")  # don't continue
+    return "\n".join(answers) + "\n"
+
+
+def stage_totals(work_dir: str) -> dict:
+    report_path = os.path.join(work_dir, "run_report.jsonl")
+    if not os.path.exists(report_path):
+        return {}
+    totals = {}
+    with open(report_path, "r", encoding="utf-8") as report_file:
+        for line in report_file:
+            entry = json.loads(line)
+            if entry.get("stage") == "channel_total":
+                totals = entry["stages"]
+    return totals
+
+
+def run_scenario(name: str, scale: float, server_url: str, metadata_latency: float, page_latency: float,
+                 config_overrides: dict, keep: bool) -> dict:
+    scenario = SCENARIOS[name]
+    channel_size = max(1, int(scenario["channel_size"] * scale))
+    work_dir = tempfile.mkdtemp(prefix=f"ytdla-bench-{name}-")
+    output_dir = os.path.join(work_dir, "out")
+    channel_path = os.path.join(output_dir, CHANNEL_NAME)
+
+    scenario_path = os.path.join(work_dir, "scenario.json")
+    with open(scenario_path, "w", encoding="utf-8") as scenario_file:
+        json.dump({"server": server_url, "channel_name": CHANNEL_NAME, "channel_size": channel_size,
+                   "title_prefix": TITLE_PREFIX, "length": media_length(scenario["media"]),
+                   "metadata_latency": metadata_latency, "page_latency": page_latency,
+                   "streams": stream_specs(scenario["media"]),
+                   "upload_every": scenario.get("upload_every", 0), "new_uploads": scenario.get("new_uploads", 0)},
+                  scenario_file)
+
+    with open(os.path.join(REPO_DIR, "config.example.json"), "r", encoding="utf-8") as config_file:
+        config = json.load(config_file)
+    config.update({"output_directory": output_dir, "video_listing": False, "show_latest_video_date": False,
+                   "default_audioMP3": scenario["audio_only"]})
+    config.update(scenario.get("config", {}))
+    config.update(config_overrides)
+    with open(os.path.join(work_dir, "config.json"), "w", encoding="utf-8") as config_file:
+        json.dump(config, config_file, indent=4)
+
+    archived = create_archive(channel_path, channel_size, scenario["archived_every"])
+    if "arguments" in scenario:
+        with open(os.path.join(work_dir, "channels.txt"), "w", encoding="utf-8") as channels_file:
+            channels_file.write(CHANNEL_URL + "\n")
+    environment = dict(os.environ, YTDLA_BENCH_SCENARIO=scenario_path, TERM="dumb",
+                       PYTHONPATH=FAKE_PYTUBEFIX_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    MediaHandler.throttle_every = scenario.get("throttle_every", 0)
+    MediaHandler.slow_every = scenario.get("slow_every", 0)
+    MediaHandler.slow_seconds = scenario.get("slow_seconds", 0.0)
+    throttled_before = MediaHandler.requests_throttled
+    bytes_before = MediaHandler.bytes_served
+    cpu_before = resource.getrusage(resource.RUSAGE_CHILDREN) if resource else None
+    started = time.monotonic()
+    with open(os.path.join(work_dir, "output.log"), "w", encoding="utf-8") as log_file:
+        # scenarios without command line arguments answer the questions of the interactive menu
+        answers = "" if "arguments" in scenario else user_answers(scenario["audio_only"])
+        try:
+            exit_code = subprocess.run([sys.executable, os.path.join(REPO_DIR, "YTDLa.py")]
+                                       + scenario.get("arguments", []), cwd=work_dir, input=answers, text=True,
+                                       env=environment, stdout=log_file, stderr=subprocess.STDOUT,
+                                       timeout=SCENARIO_TIMEOUT_SECONDS).returncode
+        except subprocess.TimeoutExpired:
+            exit_code = "timeout"
+    wall_time = time.monotonic() - started
+    cpu_time = None
+    if resource:
+        cpu_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu_time = (cpu_after.ru_utime - cpu_before.ru_utime) + (cpu_after.ru_stime - cpu_before.ru_stime)
+
+    downloaded = count_archived_files(channel_path) - archived
+    megabytes = (MediaHandler.bytes_served - bytes_before) / 1048576
+    result = {"scenario": name, "channel_size": channel_size, "archived": archived, "downloaded": downloaded,
+              "wall_seconds": round(wall_time, 2), "videos_per_min": round(downloaded / wall_time * 60, 2),
+              "listed_per_min": round(channel_size / wall_time * 60, 2), "mb_per_s": round(megabytes / wall_time, 2),
+              "cpu_seconds": round(cpu_time, 2) if cpu_time is not None else None,
+              "exit_code": exit_code,
+              "throttled_requests": MediaHandler.requests_throttled - throttled_before, "stages": stage_totals(work_dir)}
+    if keep or exit_code != 0 or downloaded <= 0:
+        result["work_dir"] = work_dir
+    else:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return result
+
+
+def compare_with_baseline(results: list[dict], baseline_path: str, tolerance: float) -> list[str]:
+    with open(baseline_path, "r", encoding="utf-8") as baseline_file:
+        baseline = {result["scenario"]: result for result in json.load(baseline_file)}
+    regressions = []
+    for result in results:
+        previous = baseline.get(result["scenario"])
+        if previous is None or previous["listed_per_min"] <= 0:
+            continue
+        # listed videos/min covers the skip-only scenarios as well as the download ones
+        change = result["listed_per_min"] / previous["listed_per_min"] - 1
+        print(f"{result['scenario']:<16} {change:+.1%} against the baseline")
+        if change < -tolerance:
+            regressions.append(result["scenario"])
+    return regressions
+
+
+def parse_config_override(value: str) -> tuple[str, object]:
+    key, _, raw_value = value.partition("=")
+    try:
+        return key, json.loads(raw_value)
+    except json.JSONDecodeError:
+        return key, raw_value
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Offline YTDLa benchmarks with a fake YouTube backend.")
+    parser.add_argument("scenarios", nargs="*", help="scenarios to run: " + ", ".join(SCENARIOS) + " (default: all)")
+    parser.add_argument("--scale", type=float, default=1.0, help="factor for the channel sizes")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds per media request")
+    parser.add_argument("--bandwidth", type=float, default=50, help="MB/s per connection, 0 = unlimited")
+    parser.add_argument("--metadata-latency", type=float, default=0.05, help="seconds per video metadata fetch")
+    parser.add_argument("--page-latency", type=float, default=0.1, help="seconds per channel listing page")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="config.json override, e.g. max_parallel_downloads=4")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed slowdown against the baseline")
+    parser.add_argument("--keep", action="store_true", help="keep the working directories")
+    args = parser.parse_args()
+
+    unknown_scenarios = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown_scenarios:
+        parser.error("unknown scenario(s): " + ", ".join(unknown_scenarios))
+    scenario_names = args.scenarios or list(SCENARIOS)
+    generate_media(sorted({media for name in scenario_names for media in SCENARIOS[name]["media"]}))
+    config_overrides = dict(parse_config_override(value) for value in args.set)
+
+    MediaHandler.latency = args.latency
+    MediaHandler.bandwidth = int(args.bandwidth * 1048576)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), MediaHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    results = []
+    try:
+        for name in scenario_names:
+            print(f"Running {name}: {SCENARIOS[name]['description']}...")
+            results.append(run_scenario(name, args.scale, server_url, args.metadata_latency, args.page_latency,
+                                        config_overrides, args.keep))
+    finally:
+        server.shutdown()
+
+    print(f"\n{'Scenario':<16} {'Videos':>8} {'New':>6} {'Wall s':>8} {'Videos/min':>11} {'MB/s':>8} {'CPU s':>8}")
+    for result in results:
+        cpu_seconds = "n/a" if result["cpu_seconds"] is None else f"{result['cpu_seconds']:.1f}"
+        print(f"{result['scenario']:<16} {result['channel_size']:>8} {result['downloaded']:>6} "
+              f"{result['wall_seconds']:>8.1f} {result['videos_per_min']:>11.1f} {result['mb_per_s']:>8.2f} "
+              f"{cpu_seconds:>8}")
+        for stage, totals in result["stages"].items():
+            print(f"    {stage:<14} {totals['count']:>6} x {totals['seconds']:>8.1f} s")
+        if result["throttled_requests"]:
+            print(f"    {'throttled':<14} {result['throttled_requests']:>6} x HTTP 429")
+        if "work_dir" in result:
+            print(f"    working directory: {result['work_dir']} (exit code {result['exit_code']})")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as json_file:
+            json.dump(results, json_file, indent=4)
+
+    failed = [result["scenario"] for result in results if result["exit_code"] != 0 or result["downloaded"] <= 0]
+    if failed:
+        print("Failed: " + ", ".join(failed))
+    regressions = compare_with_baseline(results, args.baseline, args.tolerance) if args.baseline else []
+    if regressions:
+        print("Slower than the baseline: " + ", ".join(regressions))
+    return 1 if failed or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
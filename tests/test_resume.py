@@ -0,0 +1,154 @@
+"""Offline tests of what lets an interrupted run continue: the segment sidecar of segmented downloads, the
+retries of throttled ranges and the directory mtimes of the archive index.
+
+Streams are served by the Range server of the benchmarks (benchmarks/run.py), nothing goes to YouTube.
+
+    python -m pytest tests
+"""
+import http.server
+import importlib.util
+import json
+import os
+import re
+import sys
+import threading
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from ytdla import core  # noqa: E402
+
+benchmark_spec = importlib.util.spec_from_file_location("benchmark_run",
+                                                        os.path.join(REPO_DIR, "benchmarks", "run.py"))
+benchmark = importlib.util.module_from_spec(benchmark_spec)
+benchmark_spec.loader.exec_module(benchmark)
+
+SEGMENT_SIZE = 64 * 1024
+STREAM_SIZE = 10 * SEGMENT_SIZE + 1234
+
+
+class RecordingHandler(benchmark.MediaHandler):
+    """MediaHandler that records the requested byte ranges."""
+    ranges = []
+
+    def do_GET(self) -> None:
+        range_match = re.match(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+        if range_match:
+            RecordingHandler.ranges.append((int(range_match.group(1)), int(range_match.group(2))))
+        super().do_GET()
+
+
+class QuietServer(http.server.ThreadingHTTPServer):
+    def handle_error(self, request, client_address) -> None:
+        pass  # cancelled downloads drop their connections
+
+
+def requested_bytes(ranges: list[tuple[int, int]]) -> int:
+    return sum(end - start + 1 for start, end in ranges)
+
+
+@pytest.fixture
+def media_server(tmp_path, monkeypatch):
+    """Serves a random stream with byte ranges, returns its URL and content."""
+    media_dir = tmp_path / "media"
+    media_dir.mkdir()
+    content = os.urandom(STREAM_SIZE)
+    (media_dir / "stream.webm").write_bytes(content)
+    monkeypatch.setattr(benchmark, "MEDIA_DIR", str(media_dir))
+    for counter in ("bytes_served", "requests_received", "requests_served", "requests_throttled"):
+        monkeypatch.setattr(benchmark.MediaHandler, counter, 0)
+    monkeypatch.setattr(RecordingHandler, "ranges", [])
+    monkeypatch.setattr(core, "SEGMENT_SIZE", SEGMENT_SIZE)
+    monkeypatch.setattr(core, "THROTTLE_MAX_BACKOFF_SECONDS", 0.1)
+    core.rate_limiter.configure(1000, 16)
+
+    server = QuietServer(("127.0.0.1", 0), RecordingHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/media/stream.webm", content
+    server.shutdown()
+    server.server_close()
+    core.pipeline_cancelled.clear()
+
+
+@pytest.mark.parametrize("connections", [1, 4])
+def test_interrupted_download_resumes_missing_segments(media_server, tmp_path, connections):
+    url, content = media_server
+    file_path = str(tmp_path / "video.webm")
+    received = [0]
+
+    def interrupt_after_three_segments(chunk: bytes, bytes_remaining: int) -> None:
+        received[0] += len(chunk)
+        if received[0] >= 3 * SEGMENT_SIZE:
+            core.pipeline_cancelled.set()  # what Ctrl+C does to a running download
+
+    with pytest.raises(core.PipelineCancelled):
+        core.segmented_download(url, file_path, STREAM_SIZE, connections, interrupt_after_three_segments)
+    core.pipeline_cancelled.clear()
+
+    with open(file_path + core.SEGMENTS_SIDECAR_SUFFIX, "r", encoding="utf-8") as sidecar_file:
+        sidecar = json.load(sidecar_file)
+    assert sidecar["size"] == STREAM_SIZE
+    assert 0 < len(sidecar["completed"]) < 11
+    completed_bytes = sum(min(SEGMENT_SIZE, STREAM_SIZE - index * SEGMENT_SIZE) for index in sidecar["completed"])
+
+    requests_before = len(RecordingHandler.ranges)
+    core.segmented_download(url, file_path, STREAM_SIZE, connections)
+
+    # only the segments missing from the sidecar are fetched again
+    assert requested_bytes(RecordingHandler.ranges[requests_before:]) == STREAM_SIZE - completed_bytes
+    with open(file_path, "rb") as file:
+        assert file.read() == content
+    assert not os.path.exists(file_path + core.SEGMENTS_SIDECAR_SUFFIX)
+
+
+def test_sidecar_of_another_size_starts_over(media_server, tmp_path):
+    url, content = media_server
+    file_path = str(tmp_path / "video.webm")
+    with open(file_path, "wb") as file:
+        file.write(b"\0" * (STREAM_SIZE - 1))
+    with open(file_path + core.SEGMENTS_SIDECAR_SUFFIX, "w", encoding="utf-8") as sidecar_file:
+        json.dump({"size": STREAM_SIZE - 1, "completed": list(range(11))}, sidecar_file)
+
+    core.segmented_download(url, file_path, STREAM_SIZE, 2)
+
+    assert requested_bytes(RecordingHandler.ranges) == STREAM_SIZE
+    with open(file_path, "rb") as file:
+        assert file.read() == content
+
+
+def test_throttled_ranges_are_retried(media_server, tmp_path, monkeypatch):
+    url, content = media_server
+    monkeypatch.setattr(benchmark.MediaHandler, "throttle_every", 3)
+    file_path = str(tmp_path / "video.webm")
+
+    core.segmented_download(url, file_path, STREAM_SIZE, 2)
+
+    assert benchmark.MediaHandler.requests_throttled > 0
+    with open(file_path, "rb") as file:
+        assert file.read() == content
+
+
+def test_archive_index_is_rebuilt_when_a_directory_changed(tmp_path):
+    channel_path = str(tmp_path / "channel")
+    year_path = os.path.join(channel_path, "2025")
+    os.makedirs(year_path)
+    open(os.path.join(year_path, "2025-01-01 - 1080p - First - v0000000001.mp4"), "wb").close()
+    assert list(core.load_archive_index(channel_path)["videos"]) == ["v0000000001"]
+
+    # an unchanged directory reuses the stored index
+    with open(core.archive_index_path(channel_path), "r", encoding="utf-8") as index_file:
+        stored = json.load(index_file)
+    stored["videos"]["v0000000009"] = []
+    with open(core.archive_index_path(channel_path), "w", encoding="utf-8") as index_file:
+        json.dump(stored, index_file)
+    assert "v0000000009" in core.load_archive_index(channel_path)["videos"]
+
+    # a file added to a year folder changes its mtime, the index is rebuilt from the files
+    open(os.path.join(year_path, "2025-01-02 - 720p - Second - v0000000002.mp4"), "wb").close()
+    stat = os.stat(year_path)
+    os.utime(year_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert sorted(core.load_archive_index(channel_path)["videos"]) == ["v0000000001", "v0000000002"]
+    assert core.find_file_by_string(channel_path, "v0000000002", "720p", False) == os.path.join(
+        channel_path, "2025", "2025-01-02 - 720p - Second - v0000000002.mp4")
@@ -0,0 +1,8 @@
+"""YTDLa - YouTube channel downloader.
+
+The library behind YTDLa.py: load_app_config() reads config.json, sync_channel() downloads a channel
+without any questions, sync_channels() several channels sharing one download queue, main() is the
+command line entry point (interactive menu without a command).
+pytubefix is imported on first use.
+"""
+from ytdla.core import load_app_config, resolve_target, sync_channel, sync_channels, main
@@ -0,0 +1,5 @@
+import sys
+
+from ytdla.core import main
+
+sys.exit(main())
@@ -0,0 +1,3321 @@
+from __future__ import annotations
+
+import argparse
+import atexit
+import importlib
+import os
+import re
+import shutil
+import subprocess
+import json
+import http.client
+import urllib.parse
+import sys
+import sqlite3
+import time
+import random
+from datetime import date, datetime
+import threading
+import heapq
+import math
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import count, islice
+
+# pytubefix is imported on first use (import_pytubefix), so --help, status and dry runs of archived
+# channels start without paying for it
+pytubefix = None
+YouTube = Channel = Playlist = display_progress_bar = None
+
+version = "0.5 (20250318)"
+header_width_global = 97
+first_column_width = 17
+first_column_width_wide = 37
+
+class BCOLORS:
+    WHITE      = "\033[97m"
+    CYAN       = "\033[96m"
+    MAGENTA    = "\033[95m"
+    BLUE       = "\033[94m"
+    YELLOW     = "\033[93m"
+    GREEN      = "\033[92m"
+    RED        = "\033[91m"
+    BLACK      = "\033[90m"
+    ORANGE     = "\033[33m"
+    UNDERLINE  = "\033[4m"
+    BOLD       = "\033[1m"
+    ENDC       = "\033[0m"
+
+REQUIRED_APP_CONFIG = {
+    "output_directory": "",
+    "youtube_base_url": "",
+    "min_duration_in_minutes": "",
+    "max_duration_in_minutes": "",
+    "video_listing": "",
+    "default_audioMP3": "",
+    "max_parallel_downloads": "",
+    "max_parallel_metadata_fetches": "",
+    "metadata_cache": "",
+    "metadata_cache_ttl_hours": "",
+    "metadata_cache_volatile_ttl_hours": "",
+    "metadata_cache_max_entries": "",
+    "incremental_sync": "",
+    "full_rescan_days": "",
+    "max_parallel_postprocessing": "",
+    "min_scratch_free_gb": "",
+    "min_output_free_gb": "",
+    "download_connections": "",
+    "preferred_video_codecs": "",
+    "allow_mkv_output": "",
+    "show_latest_video_date": "",
+    "latest_upload_refresh_minutes": "",
+    "max_requests_per_second": "",
+    "max_concurrent_requests": "",
+    "run_report": "",
+    "prometheus_textfile": "",
+    "watch_interval_minutes": "",
+    "scheduling_policy": ""
+}
+
+CHANNEL_CONFIG_FILE = "/_config_channel.json"
+
+REQUIRED_VIDEO_CHANNEL_CONFIG = {
+    "c_max_resolution": "",
+    "c_ignore_min_duration": "",
+    "c_ignore_max_duration": "",
+    "c_skip_restricted": "",
+    "c_minimum_views": "",
+    "c_year_subfolders": "",
+    "c_exclude_video_ids": "",
+    "c_include_video_ids": "",
+    "c_filter_words": "",
+    "c_watch_interval_minutes": "",
+    "c_scheduling_policy": "",
+    "c_download_weight": ""
+}
+
+VIDEO_CONTAINERS = ("mp4", "mkv")
+# ffmpeg muxers of the output containers, outputs are written to a .part file first
+OUTPUT_MUXERS = {"mp4": "mp4", "mkv": "matroska", "mp3": "mp3"}
+# allowed difference between the duration of an output file and the length of its video
+DURATION_TOLERANCE_SECONDS = 3
+DURATION_TOLERANCE_RATIO = 0.01
+# codecs that can be stream copied into the output container
+COPYABLE_VIDEO_CODECS = {"mp4": ("avc1", "av01"), "mkv": ("avc1", "av01", "vp9")}
+
+ARCHIVE_INDEX_FILE = "_archive_index.json"
+archive_indexes = {}
+archive_index_lock = threading.Lock()
+# ioctl that clones a file on copy-on-write filesystems (btrfs, XFS)
+FICLONE = 0x40049409
+
+video_metadata = {}
+# YouTube objects of prefetched videos for their download, video ID -> (YouTube, time fetched). Only a few are
+# kept per download slot and only while their stream URLs are fresh, the others are fetched again by the download
+video_objects = {}
+VIDEO_OBJECTS_PER_DOWNLOAD = 4
+VIDEO_OBJECT_MAX_AGE_SECONDS = 1800
+
+METADATA_CACHE_FILE = "metadata_cache.sqlite"
+UNPLAYABLE_STATUSES = ("UNPLAYABLE", "LIVE_STREAM_OFFLINE")
+REQUIRED_VIDEO_METADATA = ("title", "length", "views", "publish_date", "age_restricted", "playability_status",
+                           "channel_url")
+# fields that never change once published, everything else expires after the volatile TTL
+CACHE_IMMUTABLE_FIELDS = {
+    "video": ("title", "length", "publish_date", "channel_url"),
+    "channel": ("channel_name",),
+    "playlist": ("owner_url",)
+}
+metadata_cache_connection = None
+metadata_cache_lock = threading.Lock()
+metadata_cache_writes = 0
+# last_access of entries read since the last write, (kind, key) -> time, written together with the next write
+# or once CACHE_ACCESS_BATCH_SIZE reads piled up
+metadata_cache_accesses = {}
+CACHE_ACCESS_BATCH_SIZE = 500
+
+SYNC_STATE_FILE = "_sync_state.json"
+SYNC_WATERMARK_SIZE = 10
+
+LATEST_UPLOADS_FILE = "latest_uploads.json"
+LATEST_UPLOAD_PAGE_SIZE = 30  # one page of the channel's video list
+latest_uploads = {}
+latest_uploads_refreshing = set()
+latest_uploads_lock = threading.Lock()
+
+VIDEO_LISTING_PAGE_SIZE = 50
+
+RUN_REPORT_FILE = "run_report.jsonl"
+# start time and stage totals of the running syncs, per sync_id of the channel settings
+run_started = {}
+stage_totals = {}
+run_report_lock = threading.Lock()
+
+THROTTLING_STATUS_CODES = (429, 503)
+THROTTLE_MAX_RETRIES = 6
+THROTTLE_MAX_BACKOFF_SECONDS = 300
+# items of a channel listing read per rate limited request, about one page of uploads
+LISTING_BATCH_SIZE = 30
+
+
+class ThrottledError(http.client.HTTPException):
+    """The remote side answered a stream request with a throttling status."""
+
+
+class CorruptOutputError(Exception):
+    """An ffmpeg output failed the check of its streams and duration."""
+
+
+class PipelineCancelled(Exception):
+    """The pipeline was cancelled (Ctrl+C or an error of the run), running jobs stop at their next check."""
+
+
+class AdaptiveRateLimiter:
+    """Token bucket plus AIMD concurrency limit shared by all requests to YouTube.
+
+    Every request takes a token (max_requests_per_second, bursts up to one second worth of tokens) and a
+    concurrency slot. Throttling answers halve rate and concurrency and pause all requests for an exponential
+    backoff with jitter, a collapsing throughput halves the concurrency. Successful requests ramp both back up
+    to the configured maximum.
+    """
+
+    def __init__(self, max_rate: float = 10, max_concurrency: int = 16):
+        self.condition = threading.Condition()
+        self.active = 0
+        self.backoff_until = 0.0
+        self.throttle_streak = 0
+        self.throughput = 0.0
+        self.configure(max_rate, max_concurrency)
+
+    def configure(self, max_rate: float, max_concurrency: int) -> None:
+        with self.condition:
+            self.max_rate = max(0.1, float(max_rate))
+            self.max_concurrency = max(1, int(max_concurrency))
+            self.rate = self.max_rate
+            self.concurrency = float(self.max_concurrency)
+            # the bucket holds at least one token, else rates below 1/s could never fill it for a request
+            self.tokens = max(1.0, self.rate)
+            self.refilled = time.monotonic()
+            self.condition.notify_all()
+
+    def acquire(self, cancelled: threading.Event | None = None) -> None:
+        """Waits for a token and a slot, raises PipelineCancelled once cancelled is set (see interrupt)."""
+        with self.condition:
+            while True:
+                if cancelled is not None and cancelled.is_set():
+                    raise PipelineCancelled("the run was cancelled")
+                now = time.monotonic()
+                self.tokens = min(max(1.0, self.rate), self.tokens + (now - self.refilled) * self.rate)
+                self.refilled = now
+                if now < self.backoff_until:
+                    wait = self.backoff_until - now
+                elif self.active >= int(self.concurrency):
+                    wait = None
+                elif self.tokens < 1:
+                    wait = (1 - self.tokens) / self.rate
+                else:
+                    self.tokens -= 1
+                    self.active += 1
+                    return
+                self.condition.wait(wait)
+
+    def interrupt(self) -> None:
+        """Wakes the waiting requests, e.g. to let them see that their run was cancelled."""
+        with self.condition:
+            self.condition.notify_all()
+
+    def release(self, throttled: bool = False) -> None:
+        with self.condition:
+            self.active -= 1
+            if throttled:
+                self.throttle_streak += 1
+                self.rate = max(0.1, self.rate / 2)
+                self.concurrency = max(1.0, self.concurrency / 2)
+                backoff = min(THROTTLE_MAX_BACKOFF_SECONDS, 2 ** self.throttle_streak)
+                self.backoff_until = max(self.backoff_until, time.monotonic() + random.uniform(backoff / 2, backoff))
+            else:
+                self.throttle_streak = 0
+                self.rate = min(self.max_rate, self.rate + self.max_rate / 20)
+                self.concurrency = min(float(self.max_concurrency), self.concurrency + 1 / self.concurrency)
+            self.condition.notify_all()
+
+    def record_throughput(self, received_bytes: int, seconds: float) -> None:
+        """Tracks the throughput of stream requests, a sample far below the average counts as congestion."""
+        if received_bytes < 1024 * 1024 or seconds <= 0:
+            return
+        sample = received_bytes / seconds
+        with self.condition:
+            if self.throughput and sample < self.throughput / 5:
+                self.concurrency = max(1.0, self.concurrency / 2)
+            self.throughput = sample if not self.throughput else 0.8 * self.throughput + 0.2 * sample
+
+
+rate_limiter = AdaptiveRateLimiter()
+
+
+def is_throttling_error(error: Exception) -> bool:
+    return (isinstance(error, ThrottledError)
+            or (pytubefix is not None and isinstance(error, pytubefix.exceptions.BotDetection))
+            or getattr(error, "code", None) in THROTTLING_STATUS_CODES)
+
+
+def rate_limited(function, *args, **kwargs):
+    """Runs a network call through the shared rate limiter, throttled calls are retried after the backoff."""
+    for attempt in range(THROTTLE_MAX_RETRIES + 1):
+        rate_limiter.acquire(pipeline_cancelled)
+        try:
+            result = function(*args, **kwargs)
+        except BaseException as ee:
+            # Ctrl+C returns the slot too, else the interrupted calls keep it for the rest of the process
+            throttled = isinstance(ee, Exception) and is_throttling_error(ee)
+            rate_limiter.release(throttled)
+            if throttled and attempt < THROTTLE_MAX_RETRIES:
+                continue
+            raise
+        rate_limiter.release()
+        return result
+
+
+def rate_limited_listing(listing, batch_size: int = LISTING_BATCH_SIZE):
+    """Yields the items of a lazily paging listing (channel uploads), listing() returns a fresh iterator.
+
+    Every batch of items is read through the rate limiter. A throttled batch is read again after the backoff
+    from a fresh iterator, the items read so far are skipped.
+    """
+    iterator = None
+    position = 0
+    while True:
+        batch = []
+
+        def read_batch() -> None:
+            nonlocal iterator
+            if iterator is None:
+                iterator = islice(iter(listing()), position + len(batch), None)
+            try:
+                batch.extend(islice(iterator, batch_size - len(batch)))
+            except Exception:
+                iterator = None  # a generator that raised is finished
+                raise
+
+        rate_limited(read_batch)
+        yield from batch
+        position += len(batch)
+        if len(batch) < batch_size:
+            return
+
+TEMP_DIRECTORY = "tmp"
+JOB_JOURNAL_FILE = "_job.json"
+job_journal_lock = threading.Lock()
+
+SEGMENT_SIZE = 8 * 1_048_576
+SEGMENTED_DOWNLOAD_MIN_SIZE = 32 * 1_048_576
+SEGMENTS_SIDECAR_SUFFIX = ".segments"
+
+download_pool = None
+postprocess_pool = None
+postprocess_slots = None
+download_jobs = []
+postprocess_jobs = []
+# set by cancel_pipeline(), the stream and segment loops of running jobs check it
+pipeline_cancelled = threading.Event()
+# ffmpeg processes of running jobs, killed by cancel_pipeline()
+running_processes = set()
+running_processes_lock = threading.Lock()
+# queued downloads per sync (a heap ordered by the channel's scheduling policy), the syncs take turns in
+# insertion order, a sync gets download_weight downloads per turn
+download_queues = {}
+download_queue_lock = threading.Lock()
+download_sequence = count()
+# videos queued in this run, a video named by two syncs (a channel and one of its playlists) is downloaded once
+queued_video_ids = set()
+# videos whose download or post-processing failed in this run per sync, video ID -> error
+failed_jobs = {}
+failed_jobs_lock = threading.Lock()
+# identity of a sync, syncs of the same channel (a channel and one of its playlists) keep their own state
+sync_sequence = count()
+# channels listed (and their metadata prefetched) side by side by sync_channels
+MAX_PARALLEL_CHANNEL_LISTINGS = 4
+
+# order of the downloads of a channel: channel listing order, newest upload, shortest video, smallest download,
+# stream copies before transcodes (smallest first)
+SCHEDULING_POLICIES = ("listing", "newest", "shortest", "smallest", "remux_first")
+# policies that need the streams of a video before its download is queued
+STREAM_SCHEDULING_POLICIES = ("smallest", "remux_first")
+
+# settings of the channel a job belongs to (download path, audio/video, resolution limit, filters), bound to
+# the thread that runs the job, so the jobs of several channels can share the download and post-processing pools
+channel_context = threading.local()
+
+FREE_SPACE_CACHE_SECONDS = 5
+# expected output size relative to the downloaded streams
+TRANSCODE_SIZE_FACTOR = 2.0
+MP3_SIZE_FACTOR = 1.6
+free_space_cache = {}
+disk_reservations = {}
+job_reservations = {}
+deferred_jobs = set()
+disk_space_condition = threading.Condition()
+
+
+def current_channel() -> dict:
+    return channel_context.settings
+
+
+def in_channel(function, settings: dict | None = None):
+    """Returns the function bound to a channel (default: the channel of the calling thread), for work that is
+    handed to another thread."""
+    if settings is None:
+        settings = getattr(channel_context, "settings", None)
+
+    def run_in_channel(*args, **kwargs):
+        channel_context.settings = settings
+        return function(*args, **kwargs)
+
+    return run_in_channel
+
+
+def import_pytubefix() -> None:
+    global pytubefix, YouTube, Channel, Playlist, display_progress_bar
+    if pytubefix is not None:
+        return
+    pytubefix_module = importlib.import_module("pytubefix")
+    importlib.import_module("pytubefix.extract")
+    importlib.import_module("pytubefix.exceptions")
+    YouTube, Channel, Playlist = pytubefix_module.YouTube, pytubefix_module.Channel, pytubefix_module.Playlist
+    display_progress_bar = importlib.import_module("pytubefix.cli").display_progress_bar
+    pytubefix = pytubefix_module
+
+
+def cc_load_config(file_path: str):
+    """Loads the JSON config file or creates an empty dictionary if the file doesn't exist."""
+    if os.path.exists(file_path):
+        with open(file_path, "r", encoding="utf-8") as file:
+            try:
+                return json.load(file)  # Load existing config
+            except json.JSONDecodeError:
+                print("❌ Error: Invalid JSON format. Resetting to default config.")
+                return {}  # Return an empty config if JSON is corrupted
+    return {}  # Return an empty config if file doesn't exist
+
+def cc_save_config(cc_file_path: str, cc_config: str) -> None:
+    """Saves the updated config dictionary back to the JSON file."""
+    with open(cc_file_path, "w", encoding="utf-8") as cc_file:
+        json.dump(cc_config, cc_file, indent=4, ensure_ascii=False)
+
+def cc_check_and_update_channel_config(cc_file_path: str, cc_required_config: dict) -> None:
+    """Ensures all required keys exist in the config file, adding missing ones."""
+    cc_config = cc_load_config(cc_file_path)  # Load existing or empty config
+
+    # Check for missing keys and add them
+    missing_keys = []
+    for key, default_value in cc_required_config.items():
+        if key not in cc_config:
+            cc_config[key] = default_value
+            missing_keys.append(key)
+
+    if missing_keys:
+        cc_save_config(cc_file_path, cc_config)  # Save only if changes were made
+
+
+def smart_input(prompt: str, default_value: str):
+    user_input = input(f"{prompt} [{default_value}]: ").strip()
+    return user_input if user_input else default_value
+
+
+def clear_screen() -> None:
+    os.system('cls' if os.name == 'nt' else 'clear')
+
+
+def load_config(c_file: str):
+    with open(c_file, "r") as file:
+        l_config = json.load(file)
+    return l_config
+
+
+def print_asteriks_line() -> None:
+    print("*" * header_width_global)
+
+
+def print_colored_text(message_text: str, color: str) -> str:
+    return f"{color}{message_text}{BCOLORS.ENDC}"
+
+
+def extract_number(res: str):
+    return int(''.join(filter(str.isdigit, res)))  # Extracts only numbers and converts to int
+
+
+def clean_youtube_urls(to_clean_video_list: list) -> list[str]:
+    prefix = youtube_base_url
+    return [to_clean_video.replace(prefix, "") for to_clean_video in to_clean_video_list]
+
+
+def clean_string_regex(text: str) -> str:
+    new_text = text.replace(":", "")
+    pattern = r"[^a-zA-Z0-9 ]"
+    return re.sub(pattern, "", new_text)
+
+
+def string_to_list(input_string: str) -> list[str]:
+    return [item.strip() for item in input_string.split(",")]
+
+
+def print_configuration(config_path: str = "config.json") -> None:
+    print("Configuration (" + os.path.abspath(config_path) + "):")
+    print_asteriks_line()
+    print_configuration_line("Output directory:", output_dir, BCOLORS.CYAN)
+    print_configuration_line("Minimum Video duration in Minutes:", min_duration, BCOLORS.CYAN)
+    print_configuration_line("Maximum Video duration in Minutes:", max_duration, BCOLORS.CYAN)
+    video_listing_color = BCOLORS.RED
+    if video_listing:
+        video_listing_color = BCOLORS.GREEN
+    print_configuration_line("Video listing:", video_listing, video_listing_color)
+    default_audio_mp3_color = BCOLORS.RED
+    if default_audio_mp3:
+        default_audio_mp3_color = BCOLORS.GREEN
+    print_configuration_line("Default audio/MP3:", default_audio_mp3, default_audio_mp3_color)
+    print_configuration_line("Parallel downloads:", str(max_parallel_downloads), BCOLORS.CYAN)
+    print_configuration_line("Download order:", scheduling_policy, BCOLORS.CYAN)
+    print_configuration_line("Preferred video codecs:", ", ".join(preferred_video_codecs), BCOLORS.CYAN)
+    allow_mkv_output_color = BCOLORS.RED
+    if allow_mkv_output:
+        allow_mkv_output_color = BCOLORS.GREEN
+    print_configuration_line("Allow MKV output:", allow_mkv_output, allow_mkv_output_color)
+    show_latest_video_date_color = BCOLORS.RED
+    if show_latest_video_date:
+        show_latest_video_date_color = BCOLORS.GREEN
+    print_configuration_line("Show latest uploads:", show_latest_video_date, show_latest_video_date_color)
+    print_configuration_line("Connections per stream:", str(download_connections), BCOLORS.CYAN)
+    print_configuration_line("Parallel post-processing:", str(max_parallel_postprocessing), BCOLORS.CYAN)
+    print_configuration_line("Disk headroom:", str(min_scratch_free_gb) + " GB scratch, " + str(min_output_free_gb)
+                             + " GB output", BCOLORS.CYAN)
+    print_configuration_line("Parallel metadata fetches:", str(max_parallel_metadata_fetches), BCOLORS.CYAN)
+    print_configuration_line("Request limit:", str(max_requests_per_second) + "/s, " + str(max_concurrent_requests)
+                             + " concurrent (adaptive)", BCOLORS.CYAN)
+    metadata_cache_color = BCOLORS.RED
+    if use_metadata_cache:
+        metadata_cache_color = BCOLORS.GREEN
+    print_configuration_line("Metadata cache:", use_metadata_cache, metadata_cache_color)
+    incremental_sync_color = BCOLORS.RED
+    if incremental_sync:
+        incremental_sync_color = BCOLORS.GREEN
+    print_configuration_line("Incremental sync:", str(incremental_sync) + " (full rescan every "
+                             + str(full_rescan_days) + " days)", incremental_sync_color)
+    run_report_color = BCOLORS.RED
+    if run_report:
+        run_report_color = BCOLORS.GREEN
+    print_configuration_line("Run report:", str(run_report) + (" (" + RUN_REPORT_FILE + ")" if run_report else ""),
+                             run_report_color)
+    if prometheus_textfile:
+        print_configuration_line("Prometheus text file:", prometheus_textfile, BCOLORS.CYAN)
+    print_asteriks_line()
+    print("")
+
+def print_configuration_line(config_desc_text: str, config_value: str, config_value_color: str) -> None:
+    print(print_colored_text(config_desc_text + " " * (first_column_width_wide - len(config_desc_text)), BCOLORS.BLACK),
+          print_colored_text(config_value, config_value_color))
+
+
+def format_header(counter: str, width: int) -> str:
+    counter_split = counter.split(" - ")
+    counter_str = ("*" * int((first_column_width - (len(counter_split[0]) + 2)) / 2) + " " + counter_split[0] + " " +
+                   "*" * int((first_column_width - (len(counter_split[0]) + 2)) / 2) + print_colored_text(f" {counter_split[1]} ", BCOLORS.CYAN)
+                   + "| " + counter_split[2] + " (" + get_free_space(output_dir) + " free) ")
+    total_length = width - 2  # Exclude parentheses ()
+
+    # Center the counter with asterisks
+    formatted = f"{counter_str.ljust(total_length, '*')}"
+
+    return formatted
+
+
+def print_video_infos(yt: YouTube, metadata: dict, res: str) -> None:
+    channel = current_channel()
+    video_views = metadata["views"]
+    print(print_colored_text("Title:" + " " * (first_column_width - len("Title:")), BCOLORS.BLACK),
+          print_colored_text(print_colored_text(metadata["title"], BCOLORS.WHITE), BCOLORS.BOLD))
+
+    views_title = print_colored_text("Views:" + " " * (first_column_width - len("Views:")), BCOLORS.BLACK)
+    if channel["min_views"] > 0:
+        print(views_title, format_view_count(video_views), " (> " + format_view_count(channel["min_views"]) + ")")
+    else:
+        print(views_title, format_view_count(video_views))
+
+    print(print_colored_text("Date:" + " " * (first_column_width - len("Date:")), BCOLORS.BLACK), metadata["publish_date"])
+
+    length_title = print_colored_text("Length: " + " " * (first_column_width - len("Length:")), BCOLORS.BLACK)
+    length_title_value = length_title + format_time(metadata["length"])
+    if channel["ignore_max_duration"] and channel["ignore_min_duration"]:
+        print(length_title_value)
+    elif channel["ignore_max_duration"]:
+        print(length_title_value, print_colored_text("  (" + min_duration + "m <", BCOLORS.BLACK))
+    elif channel["ignore_min_duration"]:
+        print(length_title_value, print_colored_text("  (< " + max_duration + "m", BCOLORS.BLACK))
+    else:
+        print(length_title_value, print_colored_text("  (" + min_duration + "m < " + max_duration + "m)", BCOLORS.BLACK))
+
+    if not channel["audio_only"]:
+        print(print_colored_text("Resolution:" + " " * (first_column_width - len("Resolution:")), BCOLORS.BLACK),
+            print_colored_text(res, BCOLORS.YELLOW), print_colored_text("  (" + channel["max_resolution"] + ")", BCOLORS.BLACK))
+        print(" " * first_column_width, print_colored_text(str(print_resolutions(yt)), BCOLORS.BLACK))
+
+
+def format_time(seconds: int) -> str:
+    minutes, seconds = divmod(seconds, 60)
+    return f"{minutes}m{seconds}s"
+
+
+def get_free_space(path: str) -> str:
+    free = cached_free_space(path)[1]  # Get disk space (in bytes)
+
+    # Convert bytes to GB or MB for readability
+    if free >= 1_000_000_000:  # If space is at least 1GB
+        formatted_space = f"{free / 1_073_741_824:.1f} GB"
+    else:
+        formatted_space = f"{free / 1_048_576:.0f} MB"  # Otherwise, use MB
+
+    return formatted_space
+
+
+def format_view_count(number: int) -> str:
+    if number >= 1_000_000_000:  # Billions
+        return f"{number / 1_000_000_000:.1f}B"
+    elif number >= 1_000_000:  # Millions
+        return f"{number / 1_000_000:.1f}M"
+    elif number >= 1_000:  # Thousands
+        return f"{number / 1_000:.1f}K"
+    else:
+        return str(number)
+
+
+def read_channel_txt_lines(filename: str) -> list[str]:
+    try:
+        with open(filename, "r", encoding="utf-8") as file:
+            rc_lines = [line.strip() for line in file.readlines()]  # Remove newlines
+        rc_lines.append("--- Enter YouTube Channel or Video URL ---")
+        return rc_lines
+    except FileNotFoundError:
+        print("❌ Error: File not found.")
+        return []
+
+
+def load_latest_uploads() -> None:
+    with latest_uploads_lock:
+        if not latest_uploads:
+            latest_uploads.update(cc_load_config(LATEST_UPLOADS_FILE))
+
+
+def fetch_latest_upload(channel_url: str) -> dict:
+    """Finds the newest playable upload of a channel on the first page of its video list."""
+    ytchannel = Channel(channel_url)
+    entry = {"channel_name": get_channel_name(ytchannel), "date": "", "video_id": ""}
+
+    def find_latest_playable() -> None:
+        for video in islice(ytchannel.videos, LATEST_UPLOAD_PAGE_SIZE):
+            if video.vid_info.get('playabilityStatus', {}).get('status') not in UNPLAYABLE_STATUSES:
+                entry["date"] = video.publish_date.strftime("%Y-%m-%d")
+                entry["video_id"] = video.video_id
+                break
+
+    rate_limited(find_latest_playable)
+    return entry
+
+
+def refresh_latest_uploads(channel_urls: list[str]) -> None:
+    """Refreshes stale latest upload entries concurrently in the background, the menu doesn't wait for it."""
+    with latest_uploads_lock:
+        pending = deque(url for url in channel_urls if url and url not in latest_uploads_refreshing and
+                        time.time() - latest_uploads.get(url, {}).get("checked", 0)
+                        >= latest_upload_refresh_minutes * 60)
+        latest_uploads_refreshing.update(pending)
+
+    def refresh_worker() -> None:
+        while True:
+            with latest_uploads_lock:
+                if not pending:
+                    return
+                channel_url = pending.popleft()
+            try:
+                entry = fetch_latest_upload(channel_url)
+                entry["checked"] = time.time()
+                with latest_uploads_lock:
+                    latest_uploads[channel_url] = entry
+                    cc_save_config(LATEST_UPLOADS_FILE, latest_uploads)
+            except Exception:
+                pass  # the last known value stays, the next menu tries again
+            finally:
+                with latest_uploads_lock:
+                    latest_uploads_refreshing.discard(channel_url)
+
+    # daemon threads, a running refresh never holds up selecting a channel or quitting
+    for _ in range(min(max_parallel_metadata_fetches, len(pending))):
+        threading.Thread(target=refresh_worker, daemon=True).start()
+
+
+def format_latest_upload(u_index: int, line: str) -> str:
+    with latest_uploads_lock:
+        entry = dict(latest_uploads.get(line, {}))
+        refreshing = line in latest_uploads_refreshing
+    spaces = (header_width_global - 32)
+    padding = " " * (spaces - len(str(u_index)) - len(line))
+    if not entry.get("date"):
+        return padding + print_colored_text("Last: checking..." if refreshing else "Last: -", BCOLORS.BLACK)
+    latest_date = entry["date"]
+    got_it = find_file_by_date(output_dir + "/" + clean_string_regex(entry["channel_name"]).rstrip(), latest_date)
+    if got_it:
+        latest_date = print_colored_text(latest_date, BCOLORS.GREEN)
+    else:
+        latest_date = print_colored_text(latest_date, BCOLORS.RED)
+    refreshing_marker = print_colored_text(" (updating)", BCOLORS.BLACK) if refreshing else ""
+    return padding + "Last: " + latest_date + " | " + entry["video_id"] + refreshing_marker
+
+
+def user_selection(u_lines, u_show_latest_video_date: bool):
+    """Displays the lines as a selection menu and gets user input.
+
+    With u_show_latest_video_date the last known upload of every channel is shown right away from
+    latest_uploads.json, stale entries are refreshed in the background. An empty input redraws the menu.
+    """
+    if not u_lines:
+        print("No lines available for selection.")
+        return None
+
+    channel_lines = u_lines[:-1]
+    if u_show_latest_video_date:
+        load_latest_uploads()
+        refresh_latest_uploads(channel_lines)
+
+    def print_menu() -> None:
+        print("Select channel:")
+        for u_index, line in enumerate(u_lines, start=1):
+            latest_date_formated = ""
+            if u_show_latest_video_date and line in channel_lines:
+                latest_date_formated = format_latest_upload(u_index, line)
+            print(f"{u_index}. {line}{latest_date_formated}")
+
+    print_menu()
+    while True:
+        try:
+            choice_input = input("\nEnter the number of your choice: ")
+            if choice_input.strip() == "" and u_show_latest_video_date:
+                print("")
+                print_menu()
+                continue
+            choice = int(choice_input)
+            if 1 <= choice <= len(u_lines):
+                return u_lines[choice - 1]  # Return selected line
+            else:
+                print("⚠️ Invalid selection. Choose a valid number.")
+        except ValueError:
+            print("⚠️ Invalid input. Please enter a number.")
+
+
+def list_channel_videos(c: Channel) -> list[str]:
+    """Lists the uploads of a channel page by page and returns the video IDs the user selected.
+
+    Uploads are read from the channel while paging, details are only fetched for the rows of the current
+    page and just the video IDs of listed rows are kept, so memory doesn't grow with the channel size.
+    """
+    uploads = (video.video_id for video in rate_limited_listing(c.videos_generator)
+               if getattr(video, "video_id", None))
+    listed_video_ids = []
+    while True:
+        page = list(islice(uploads, VIDEO_LISTING_PAGE_SIZE))
+        print("")
+        for video_id, metadata in prefetch_video_metadata(page):
+            release_video_object(video_id)
+            listed_video_ids.append(video_id)
+            video_message = f"{len(listed_video_ids)}. {clean_string_regex(metadata.get('title', video_id))}"
+            space_formated = " " * (73 - len(video_message))
+            if "error" in metadata:
+                print(print_colored_text(video_message + space_formated + "unavailable", BCOLORS.BLACK))
+                continue
+            video_date_formated = print_colored_text(metadata["publish_date"], BCOLORS.BLACK)
+            if metadata["age_restricted"]:
+                print(print_colored_text(video_message + space_formated + video_date_formated, BCOLORS.RED))
+            else:
+                print(video_message + space_formated + video_date_formated)
+        more_pages = len(page) == VIDEO_LISTING_PAGE_SIZE
+
+        # Ask user for selection, numbers of all pages listed so far are valid
+        while True:
+            try:
+                next_page_hint = ", Enter for the next page" if more_pages else ", Enter to skip"
+                choices = input("\nSelect one or more videos by entering numbers separated by commas"
+                                + next_page_hint + ": ").strip()
+                if choices == "":
+                    break
+                selected_indices = [int(x.strip()) for x in choices.split(",")]
+
+                # Validate selection
+                if all(1 <= index <= len(listed_video_ids) for index in selected_indices):
+                    return [listed_video_ids[i - 1] for i in selected_indices]  # Get the chosen videos
+                else:
+                    print("Invalid choice(s), please enter valid numbers from the list.")
+            except ValueError:
+                print("Invalid input, please enter numbers separated by commas.")
+        if not more_pages:
+            return []
+
+
+@contextmanager
+def stage_timer(video_id: str | None, stage: str):
+    """Measures the wall time of a stage, the caller puts the bytes the stage handled into the yielded dict."""
+    measurement = {"bytes": 0}
+    started = time.monotonic()
+    try:
+        yield measurement
+    except BaseException:
+        record_stage(video_id, stage, time.monotonic() - started, measurement["bytes"], False)
+        raise
+    record_stage(video_id, stage, time.monotonic() - started, measurement["bytes"], True)
+
+
+def record_stage(video_id: str | None, stage: str, seconds: float, byte_count: int, ok: bool) -> None:
+    """Adds a stage measurement to the channel totals and appends it to the JSON lines run report."""
+    settings = getattr(channel_context, "settings", None)
+    if settings is None:
+        return  # e.g. the video listing, no channel is being synced yet
+    channel_name = settings["name"]
+    with run_report_lock:
+        totals = stage_totals.setdefault(settings["sync_id"], {}).setdefault(
+            stage, {"count": 0, "failed": 0, "seconds": 0.0, "bytes": 0})
+        totals["count"] += 1
+        totals["failed"] += 0 if ok else 1
+        totals["seconds"] += seconds
+        totals["bytes"] += byte_count
+        if run_report:
+            append_run_report({"time": datetime.now().isoformat(timespec="seconds"), "channel": channel_name,
+                               "video_id": video_id, "stage": stage, "seconds": round(seconds, 3),
+                               "bytes": byte_count, "ok": ok})
+
+
+def append_run_report(entry: dict) -> None:
+    with open(RUN_REPORT_FILE, "a", encoding="utf-8") as report_file:
+        report_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def start_run_report(sync_id: int) -> None:
+    with run_report_lock:
+        run_started[sync_id] = time.monotonic()
+        stage_totals[sync_id] = {}
+
+
+def finish_run_report(channel: dict, videos_downloaded: int, videos_failed: int = 0) -> None:
+    """Writes the per-channel totals of the run to the report and the Prometheus text file, prints a summary."""
+    channel_name = channel["name"]
+    with run_report_lock:
+        wall_time = time.monotonic() - run_started.pop(channel["sync_id"])
+        totals = {stage: {**values, "seconds": round(values["seconds"], 3)}
+                  for stage, values in stage_totals.pop(channel["sync_id"]).items()}
+        if run_report:
+            append_run_report({"time": datetime.now().isoformat(timespec="seconds"), "channel": channel_name,
+                               "stage": "channel_total", "seconds": round(wall_time, 3),
+                               "videos": videos_downloaded, "failed_videos": videos_failed, "stages": totals})
+        if prometheus_textfile:
+            write_prometheus_textfile(channel_name, wall_time, videos_downloaded, videos_failed, totals)
+
+    if totals:
+        print(print_colored_text("\nStage                  Count     Seconds       MB/s", BCOLORS.BLACK))
+        for stage, values in totals.items():
+            throughput = values["bytes"] / values["seconds"] / 1048576 if values["seconds"] > 0 else 0
+            print(print_colored_text(f"{stage:<20} {values['count']:>7} {values['seconds']:>11.1f} "
+                                     f"{throughput:>10.2f}", BCOLORS.BLACK))
+
+
+def write_prometheus_textfile(channel_name: str, wall_time: float, videos_downloaded: int, videos_failed: int,
+                              totals: dict) -> None:
+    """Writes the last run of the channel in the Prometheus text format for the node_exporter textfile collector.
+
+    Metrics of other channels already in the file are kept, the file is replaced atomically.
+    """
+    channel_label = channel_name.replace("\\", "\\\\").replace('"', '\\"')
+    samples = [f'ytdla_last_run_timestamp_seconds{{channel="{channel_label}"}} {time.time():.0f}',
+               f'ytdla_last_run_duration_seconds{{channel="{channel_label}"}} {wall_time:.3f}',
+               f'ytdla_last_run_videos{{channel="{channel_label}"}} {videos_downloaded}',
+               f'ytdla_last_run_failed_videos{{channel="{channel_label}"}} {videos_failed}']
+    for stage, values in totals.items():
+        labels = f'channel="{channel_label}",stage="{stage}"'
+        samples.append(f"ytdla_last_run_stage_count{{{labels}}} {values['count']}")
+        samples.append(f"ytdla_last_run_stage_failed{{{labels}}} {values['failed']}")
+        samples.append(f"ytdla_last_run_stage_seconds{{{labels}}} {values['seconds']:.3f}")
+        samples.append(f"ytdla_last_run_stage_bytes{{{labels}}} {values['bytes']}")
+
+    kept = []
+    if os.path.exists(prometheus_textfile):
+        with open(prometheus_textfile, "r", encoding="utf-8") as metrics_file:
+            kept = [line.rstrip("\n") for line in metrics_file
+                    if line.startswith("ytdla_") and f'channel="{channel_label}"' not in line]
+    metric_names = ("timestamp_seconds", "duration_seconds", "videos", "failed_videos", "stage_count",
+                    "stage_failed", "stage_seconds", "stage_bytes")
+    lines = []
+    for name in metric_names:
+        lines.append(f"# TYPE ytdla_last_run_{name} gauge")
+        lines.extend(sorted(sample for sample in kept + samples
+                            if sample.startswith(f"ytdla_last_run_{name}{{")))
+    temp_file = prometheus_textfile + ".tmp"
+    with open(temp_file, "w", encoding="utf-8") as metrics_file:
+        metrics_file.write("\n".join(lines) + "\n")
+    os.replace(temp_file, prometheus_textfile)
+
+
+def job_directory(video_id: str) -> str:
+    return os.path.join(TEMP_DIRECTORY, video_id)
+
+
+def delete_temp_files(job_dir: str | None = None) -> None:
+    """Removes the scratch directory of a job, or all scratch directories without a job journal."""
+    if job_dir is not None:
+        shutil.rmtree(job_dir, ignore_errors=True)
+        return
+
+    if not os.path.exists(TEMP_DIRECTORY):
+        return
+    # jobs with a journal are kept, they are resumed when their video comes up again
+    for entry in os.scandir(TEMP_DIRECTORY):
+        if entry.is_dir() and not os.path.exists(os.path.join(entry.path, JOB_JOURNAL_FILE)):
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def count_unfinished_jobs() -> int:
+    if not os.path.exists(TEMP_DIRECTORY):
+        return 0
+    return sum(1 for entry in os.scandir(TEMP_DIRECTORY)
+               if entry.is_dir() and os.path.exists(os.path.join(entry.path, JOB_JOURNAL_FILE)))
+
+
+def start_job_journal(job_dir: str, video_id: str, res: str, format_id: str) -> dict:
+    """Loads the journal of an unfinished job, or starts a new job if there is none or its settings differ."""
+    channel = current_channel()
+    journal = cc_load_config(os.path.join(job_dir, JOB_JOURNAL_FILE))
+    if (journal.get("resolution") == res and journal.get("audio_only") == channel["audio_only"]
+            and journal.get("format") == format_id):
+        if journal["completed"]:
+            print(print_colored_text("\nResuming unfinished job, completed: "
+                                     + ", ".join(journal["completed"]), BCOLORS.BLACK))
+        return journal
+
+    delete_temp_files(job_dir)
+    os.makedirs(job_dir, exist_ok=True)
+    journal = {"video_id": video_id, "resolution": res, "audio_only": channel["audio_only"], "format": format_id,
+               "completed": {}}
+    cc_save_config(os.path.join(job_dir, JOB_JOURNAL_FILE), journal)
+    return journal
+
+
+def job_stage_file(journal: dict, stage: str) -> str | None:
+    """Returns the output of a completed job stage, if it is still there."""
+    stage_file = journal["completed"].get(stage)
+    if stage_file and os.path.exists(stage_file):
+        return stage_file
+    return None
+
+
+def complete_job_stage(job_dir: str, journal: dict, stage: str, stage_file: str) -> None:
+    with job_journal_lock:
+        journal["completed"][stage] = stage_file
+        cc_save_config(os.path.join(job_dir, JOB_JOURNAL_FILE), journal)
+
+
+def print_resolutions(yt: YouTube) -> list[str]:
+    metadata = video_metadata.get(yt.video_id)
+    if metadata is not None and "resolutions" in metadata:
+        return metadata["resolutions"]
+
+    streams = yt.streams.filter(type='video')  # StreamQuery object, all containers
+    # Convert StreamQuery to a formatted string
+    stream_string = "\n".join([str(stream) for stream in streams])
+    # Extract resolutions using regex
+    resolutions = re.findall(r'res="(\d+p)"', stream_string)
+    # Remove duplicates and sort in descending order
+    unique_resolutions = sorted(set(resolutions), key=lambda x: int(x[:-1]), reverse=True)
+    if metadata is not None:
+        metadata["resolutions"] = unique_resolutions
+        cache_put("video", yt.video_id, {"resolutions": unique_resolutions})
+
+    return unique_resolutions
+
+
+def fetch_video_metadata(video_id: str) -> dict:
+    """Fetches the metadata needed for filtering and downloading, keeps the YouTube object for the download
+    (see keep_video_object)."""
+    yt = YouTube(youtube_base_url + video_id)
+    publish_date = yt.publish_date
+    metadata = {
+        "video_id": video_id,
+        "title": yt.title,
+        "length": yt.length,
+        "views": yt.views,
+        "publish_date": publish_date.strftime("%Y-%m-%d") if publish_date else "",
+        "age_restricted": yt.age_restricted,
+        "playability_status": yt.vid_info.get('playabilityStatus', {}).get('status'),
+        "channel_url": yt.channel_url
+    }
+    keep_video_object(video_id, yt)
+    cache_put("video", video_id, metadata)
+    return metadata
+
+
+def get_video_metadata(video_id: str) -> dict:
+    if video_id not in video_metadata:
+        metadata = cache_get("video", video_id)
+        if not all(field in metadata for field in REQUIRED_VIDEO_METADATA):
+            with stage_timer(video_id, "metadata"):
+                metadata = rate_limited(fetch_video_metadata, video_id)
+        metadata["video_id"] = video_id
+        video_metadata[video_id] = metadata
+    return video_metadata[video_id]
+
+
+def get_channel_name(c: Channel) -> str:
+    cached = cache_get("channel", c.channel_url)
+    if "channel_name" not in cached:
+        cached = {"channel_name": str(rate_limited(lambda: c.channel_name))}
+        cache_put("channel", c.channel_url, cached)
+    return cached["channel_name"]
+
+
+def get_playlist_info(playlist_url: str) -> dict:
+    """Returns owner URL and video IDs of a playlist."""
+    cached = cache_get("playlist", playlist_url)
+    if "owner_url" not in cached or "video_ids" not in cached:
+        playlist = Playlist(playlist_url)
+        cached = rate_limited(lambda: {"owner_url": playlist.owner_url,
+                                       "video_ids": [pytubefix.extract.video_id(p_url)
+                                                     for p_url in playlist.video_urls]})
+        cache_put("playlist", playlist_url, cached)
+    return cached
+
+
+def open_metadata_cache() -> None:
+    global metadata_cache_connection
+    if not use_metadata_cache:
+        if metadata_cache_connection is not None:
+            with metadata_cache_lock:
+                flush_cache_accesses()
+                metadata_cache_connection.commit()
+            metadata_cache_connection.close()
+            metadata_cache_connection = None
+        return
+    if metadata_cache_connection is not None:
+        return
+    metadata_cache_connection = sqlite3.connect(METADATA_CACHE_FILE, check_same_thread=False)
+    atexit.register(save_cache_accesses)
+    metadata_cache_connection.execute("PRAGMA journal_mode=WAL")
+    metadata_cache_connection.execute("PRAGMA synchronous=NORMAL")
+    metadata_cache_connection.execute(
+        "CREATE TABLE IF NOT EXISTS metadata_cache (kind TEXT, key TEXT, immutable TEXT, immutable_time REAL, "
+        "volatile TEXT, volatile_time REAL, last_access REAL, PRIMARY KEY (kind, key))")
+    metadata_cache_connection.execute(
+        "CREATE INDEX IF NOT EXISTS metadata_cache_last_access ON metadata_cache (last_access)")
+    metadata_cache_connection.commit()
+
+
+def cache_get(kind: str, key: str) -> dict:
+    """Returns the cached fields of an entry that are still within their TTL."""
+    if metadata_cache_connection is None:
+        return {}
+    now = time.time()
+    with metadata_cache_lock:
+        row = metadata_cache_connection.execute(
+            "SELECT immutable, immutable_time, volatile, volatile_time FROM metadata_cache WHERE kind=? AND key=?",
+            (kind, key)).fetchone()
+        if row is None:
+            return {}
+        metadata_cache_accesses[(kind, key)] = now
+        if len(metadata_cache_accesses) >= CACHE_ACCESS_BATCH_SIZE:
+            flush_cache_accesses()
+            metadata_cache_connection.commit()
+
+    cached = {}
+    if now - row[1] < metadata_cache_ttl_hours * 3600:
+        cached.update(json.loads(row[0]))
+    if now - row[3] < metadata_cache_volatile_ttl_hours * 3600:
+        cached.update(json.loads(row[2]))
+    return cached
+
+
+def flush_cache_accesses() -> None:
+    """Writes the pending last_access times, the caller holds metadata_cache_lock and commits."""
+    metadata_cache_connection.executemany("UPDATE metadata_cache SET last_access=? WHERE kind=? AND key=?",
+                                          [(access, kind, key)
+                                           for (kind, key), access in metadata_cache_accesses.items()])
+    metadata_cache_accesses.clear()
+
+
+def save_cache_accesses() -> None:
+    """Writes the last_access times still pending when the program ends."""
+    with metadata_cache_lock:
+        if metadata_cache_connection is not None and metadata_cache_accesses:
+            flush_cache_accesses()
+            metadata_cache_connection.commit()
+
+
+def cache_put(kind: str, key: str, data: dict) -> None:
+    """Stores or updates an entry, fields without new values keep their previous value and timestamp."""
+    global metadata_cache_writes
+    if metadata_cache_connection is None:
+        return
+    now = time.time()
+    immutable = {field: value for field, value in data.items() if field in CACHE_IMMUTABLE_FIELDS[kind]}
+    volatile = {field: value for field, value in data.items()
+                if field not in CACHE_IMMUTABLE_FIELDS[kind] and field not in ("video_id", "error")}
+
+    with metadata_cache_lock:
+        row = metadata_cache_connection.execute(
+            "SELECT immutable, immutable_time, volatile, volatile_time FROM metadata_cache WHERE kind=? AND key=?",
+            (kind, key)).fetchone()
+        immutable_time = volatile_time = now
+        if row is not None:
+            immutable = {**json.loads(row[0]), **immutable} if immutable else json.loads(row[0])
+            volatile = {**json.loads(row[2]), **volatile} if volatile else json.loads(row[2])
+            immutable_time = now if immutable.keys() & data.keys() else row[1]
+            volatile_time = now if volatile.keys() & data.keys() else row[3]
+        metadata_cache_connection.execute(
+            "INSERT OR REPLACE INTO metadata_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (kind, key, json.dumps(immutable), immutable_time, json.dumps(volatile), volatile_time, now))
+        metadata_cache_accesses.pop((kind, key), None)
+        flush_cache_accesses()
+
+        metadata_cache_writes += 1
+        if metadata_cache_writes % 100 == 0:
+            # least recently used entries are evicted once the cache outgrows its size cap
+            entry_count = metadata_cache_connection.execute("SELECT COUNT(*) FROM metadata_cache").fetchone()[0]
+            if entry_count > metadata_cache_max_entries:
+                metadata_cache_connection.execute(
+                    "DELETE FROM metadata_cache WHERE rowid IN "
+                    "(SELECT rowid FROM metadata_cache ORDER BY last_access LIMIT ?)",
+                    (entry_count - metadata_cache_max_entries,))
+        metadata_cache_connection.commit()
+
+
+def prefetch_video_metadata(video_ids: list[str], resolve=get_video_metadata):
+    """Resolves the metadata of all given videos concurrently, yields (video_id, metadata) in list order."""
+    video_ids = iter(video_ids)
+    pool = ThreadPoolExecutor(max_workers=max_parallel_metadata_fetches)
+    pending = deque()
+    try:
+        # only a bounded window of videos is resolved ahead of the consumer
+        for video_id in islice(video_ids, max_parallel_metadata_fetches * 4):
+            pending.append((video_id, pool.submit(in_channel(resolve), video_id)))
+        while pending:
+            video_id, future = pending.popleft()
+            next_video_id = next(video_ids, None)
+            if next_video_id is not None:
+                pending.append((next_video_id, pool.submit(in_channel(resolve), next_video_id)))
+            try:
+                yield video_id, future.result()
+            except Exception as ee:
+                yield video_id, {"video_id": video_id, "error": str(ee)}
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def keep_video_object(video_id: str, yt: YouTube) -> None:
+    if len(video_objects) < max_parallel_downloads * VIDEO_OBJECTS_PER_DOWNLOAD:
+        video_objects[video_id] = (yt, time.monotonic())
+
+
+def take_video_object(video_id: str) -> YouTube | None:
+    """Returns the kept YouTube object of a video if its stream URLs are still fresh, it isn't kept anymore."""
+    yt, fetched = video_objects.pop(video_id, (None, 0.0))
+    if yt is None or time.monotonic() - fetched > VIDEO_OBJECT_MAX_AGE_SECONDS:
+        return None
+    return yt
+
+
+def release_video_object(video_id: str) -> None:
+    video_objects.pop(video_id, None)
+
+
+def archive_index_path(channel_path: str) -> str:
+    return os.path.join(channel_path, ARCHIVE_INDEX_FILE)
+
+
+def parse_archive_filename(channel_path: str, root: str, filename: str) -> tuple[str | None, dict | None]:
+    """Extracts video ID, date, resolution, kind, year folder and restricted flag from an archived file name.
+
+    The video codec isn't part of the name, it's only known for files written (or linked) by YTDLa.
+    """
+    stem, extension = os.path.splitext(filename)
+    if extension not in (".mp4", ".mkv", ".mp3"):
+        return None, None
+    parts = stem.split(" - ")
+    if len(parts) < 3 or len(parts[-1]) != 11:
+        return None, None
+
+    relative_dir = os.path.relpath(root, channel_path)
+    dir_parts = [] if relative_dir == "." else relative_dir.replace("\\", "/").split("/")
+    resolution = ""
+    if extension != ".mp3" and len(parts) >= 4:
+        resolution = parts[1]
+
+    return parts[-1], {
+        "file": filename if relative_dir == "." else os.path.join(relative_dir, filename),
+        "date": parts[0],
+        "resolution": resolution,
+        "kind": extension[1:],
+        "codec": "mp3" if extension == ".mp3" else "",
+        "year": dir_parts[0] if dir_parts and dir_parts[0].isdigit() else "",
+        "restricted": "restricted" in dir_parts
+    }
+
+
+def stat_directory_mtimes(channel_path: str, relative_dirs) -> dict:
+    dir_mtimes = {}
+    for relative_dir in relative_dirs:
+        try:
+            dir_mtimes[relative_dir] = os.stat(os.path.join(channel_path, relative_dir)).st_mtime_ns
+        except OSError:
+            pass
+    return dir_mtimes
+
+
+def rebuild_archive_index(channel_path: str, previous: dict | None = None) -> dict:
+    """Walks the channel directory once and collects all archived videos, known codecs are kept from the
+    previous index."""
+    codecs = {entry["file"]: entry["codec"] for entries in (previous or {}).get("videos", {}).values()
+              for entry in entries if entry.get("codec")}
+    index = {"dirs": {}, "videos": {}}
+    for root, _, files in os.walk(channel_path):
+        relative_dir = os.path.relpath(root, channel_path)
+        index["dirs"].update(stat_directory_mtimes(channel_path, [relative_dir]))
+        for filename in files:
+            video_id, entry = parse_archive_filename(channel_path, root, filename)
+            if video_id:
+                entry["codec"] = codecs.get(entry["file"], entry["codec"])
+                index["videos"].setdefault(video_id, []).append(entry)
+    return index
+
+
+def save_archive_index(channel_path: str, index: dict) -> None:
+    index_file = archive_index_path(channel_path)
+    if not os.path.exists(index_file):
+        # create the file first, so the directory mtime recorded below already includes it
+        open(index_file, "a").close()
+    index["dirs"] = stat_directory_mtimes(channel_path, index["dirs"])
+    with open(index_file, "r+", encoding="utf-8") as file:
+        json.dump(index, file)
+        file.truncate()
+
+
+def load_archive_index(channel_path: str) -> dict:
+    """Loads the archive index of a channel directory, rebuilds it if any directory changed since it was written."""
+    if not os.path.exists(channel_path):
+        archive_indexes[channel_path] = {"dirs": {}, "videos": {}}
+        return archive_indexes[channel_path]
+
+    index = None
+    previous = None
+    try:
+        with open(archive_index_path(channel_path), "r", encoding="utf-8") as file:
+            previous = json.load(file)
+        if stat_directory_mtimes(channel_path, previous["dirs"]) == previous["dirs"]:
+            index = previous
+    except (OSError, ValueError, KeyError, TypeError):
+        previous = None
+
+    if index is None:
+        index = rebuild_archive_index(channel_path, previous if isinstance(previous, dict) else None)
+        save_archive_index(channel_path, index)
+
+    archive_indexes[channel_path] = index
+    return index
+
+
+def get_archive_index(channel_path: str) -> dict:
+    if channel_path in archive_indexes:
+        return archive_indexes[channel_path]
+    return load_archive_index(channel_path)
+
+
+def archive_index_add(channel_path: str, file_path: str, codec: str = "") -> None:
+    """Adds a freshly written output file to the archive index of its channel directory."""
+    root, filename = os.path.split(os.path.abspath(file_path))
+    video_id, entry = parse_archive_filename(os.path.abspath(channel_path), root, filename)
+    if not video_id:
+        return
+    entry["codec"] = codec or entry["codec"]
+
+    with archive_index_lock:
+        index = get_archive_index(channel_path)
+        variants = [variant for variant in index["videos"].get(video_id, []) if variant["file"] != entry["file"]]
+        variants.append(entry)
+        index["videos"][video_id] = variants
+
+        # track the output directory and all its parents, they were created or modified by this write
+        relative_dir = os.path.dirname(entry["file"])
+        while True:
+            index["dirs"][relative_dir or "."] = 0
+            if not relative_dir:
+                break
+            relative_dir = os.path.dirname(relative_dir)
+        save_archive_index(channel_path, index)
+
+
+def resolution_height(resolution: str) -> int:
+    return int(''.join(filter(str.isdigit, resolution.split("p")[0])) or 0)
+
+
+def catalog_channel_paths() -> list[str]:
+    """The channel directories of output_directory, together their archive indexes are the archive catalog."""
+    try:
+        names = sorted(os.listdir(output_dir))
+    except OSError:
+        return []
+    return [output_dir + "/" + name for name in names if os.path.isdir(output_dir + "/" + name)]
+
+
+def catalog_variants(video_id: str, kind: str, channel_path: str) -> list[tuple[str, dict]]:
+    """Returns (channel directory, index entry) of every archived variant of a video in the given kind
+    (video/mp3) across the catalog and the given channel directory, highest resolution and preferred codec
+    first."""
+    channel_paths = catalog_channel_paths()
+    if channel_path not in channel_paths:
+        channel_paths.append(channel_path)
+
+    variants = []
+    for path in channel_paths:
+        for entry in get_archive_index(path)["videos"].get(video_id, []):
+            kind_matches = entry["kind"] in VIDEO_CONTAINERS if kind == "video" else entry["kind"] == kind
+            if kind_matches:
+                variants.append((path, entry))
+
+    def rank(variant: tuple[str, dict]) -> tuple:
+        codec = variant[1].get("codec", "")
+        codec_rank = preferred_video_codecs.index(codec) if codec in preferred_video_codecs else len(
+            preferred_video_codecs)
+        return -resolution_height(variant[1]["resolution"]), codec_rank
+
+    return sorted(variants, key=rank)
+
+
+def link_archived_file(source: str, target: str) -> bool:
+    """Reflinks an archived file to a new path on copy-on-write filesystems (btrfs, XFS), the copies stay
+    independent, else hard links it. False if neither works (e.g. different filesystems)."""
+    partial_file = target + ".part"
+    try:
+        import fcntl
+        with open(source, "rb") as source_file, open(partial_file, "wb") as target_file:
+            fcntl.ioctl(target_file.fileno(), FICLONE, source_file.fileno())
+        os.replace(partial_file, target)
+        return True
+    except (ImportError, OSError):
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
+    try:
+        os.link(source, target)
+        return True
+    except OSError:
+        return False
+
+
+def retire_replaced_variants(video_id: str, res: str) -> None:
+    """Deletes the archived videos of a lower resolution than res, once the upgraded video is in place."""
+    channel_path = current_channel()["path"]
+    with archive_index_lock:
+        index = get_archive_index(channel_path)
+        kept = []
+        for entry in index["videos"].get(video_id, []):
+            if entry["kind"] in VIDEO_CONTAINERS and resolution_height(entry["resolution"]) < resolution_height(res):
+                print(print_colored_text(f"Replaced {entry['file']}", BCOLORS.BLACK))
+                try:
+                    os.remove(os.path.join(channel_path, entry["file"]))
+                except FileNotFoundError:
+                    pass
+            else:
+                kept.append(entry)
+        index["videos"][video_id] = kept
+        save_archive_index(channel_path, index)
+
+
+def find_file_by_string(directory: str, video_id: str, resolution: str, mp3: bool) -> str | None:
+    if resolution=="max":
+        resolution = ""
+    if mp3:
+        resolution = "mp3"
+
+    if not os.path.exists(directory):
+        return None
+
+    # a direct lookup in the archive index, new uploads aren't in it
+    for entry in get_archive_index(directory)["videos"].get(video_id, []):
+        if resolution in os.path.basename(entry["file"]):
+            return os.path.join(directory, entry["file"])
+
+    return None  # Return None if no file is found
+
+
+def find_file_by_date(directory: str, publish_date: str) -> str | None:
+    """Returns an archived video of the channel directory published on the date, scans the whole index."""
+    if not os.path.exists(directory):
+        return None
+    for entries in get_archive_index(directory)["videos"].values():
+        for entry in entries:
+            if entry["date"] == publish_date:
+                return os.path.join(directory, entry["file"])
+    return None
+
+
+def load_sync_state(channel_path: str) -> dict:
+    """Loads the watermark of the last completed channel sync, stored next to _config_channel.json."""
+    sync_state = cc_load_config(os.path.join(channel_path, SYNC_STATE_FILE))
+    if not sync_state.get("recent_video_ids"):
+        return {}
+    return sync_state
+
+
+def sync_settings(channel: dict, exclude_ids: list[str], filter_words: list[str]) -> dict:
+    """The settings that decide which uploads a sync downloads, a watermark only holds for the same settings."""
+    return {"audio_only": channel["audio_only"], "max_resolution": channel["max_resolution"],
+            "min_duration": None if channel["ignore_min_duration"] else int(min_duration),
+            "max_duration": None if channel["ignore_max_duration"] else int(max_duration),
+            "skip_restricted": channel["skip_restricted"], "min_views": channel["min_views"],
+            "exclude_ids": sorted(clean_youtube_urls(exclude_ids)),
+            "filter_words": sorted(word.lower() for word in filter_words if word != "")}
+
+
+def full_rescan_due(sync_state: dict, settings: dict) -> bool:
+    if not sync_state or not incremental_sync:
+        return True
+    if sync_state.get("settings") != settings:
+        print(print_colored_text("\nSync settings changed since the last run, full rescan", BCOLORS.ORANGE))
+        return True
+    try:
+        last_full_scan = datetime.strptime(sync_state["last_full_scan"], "%Y-%m-%d").date()
+    except (KeyError, ValueError):
+        return True
+    return (date.today() - last_full_scan).days >= full_rescan_days
+
+
+def save_sync_state(channel_path: str, sync_state: dict, listed_video_ids: list[str], full_scan: bool,
+                    retry_video_ids: list[str] | None = None, settings: dict | None = None) -> None:
+    """Moves the watermark to the newest uploads of this run.
+
+    retry_video_ids (default: the ones of the last run) are videos that failed or were skipped, the
+    watermark moves past them, so they are stored and added to the candidates of the next run. settings
+    (default: the ones of the last run) are the sync_settings the watermark was reached with.
+    """
+    if retry_video_ids is None:
+        retry_video_ids = sync_state.get("retry_video_ids", [])
+    if settings is None:
+        settings = sync_state.get("settings", {})
+    if (not listed_video_ids and retry_video_ids == sync_state.get("retry_video_ids", [])
+            and settings == sync_state.get("settings", {})):
+        return
+    recent_video_ids = (listed_video_ids + sync_state.get("recent_video_ids", []))[:SYNC_WATERMARK_SIZE]
+    if not recent_video_ids:
+        return
+    try:
+        last_publish_date = get_video_metadata(recent_video_ids[0])["publish_date"]
+    except Exception:
+        last_publish_date = ""
+    sync_state = {
+        "last_video_id": recent_video_ids[0],
+        "last_publish_date": last_publish_date,
+        "recent_video_ids": recent_video_ids,
+        "retry_video_ids": retry_video_ids,
+        "settings": settings,
+        "last_full_scan": date.today().strftime("%Y-%m-%d") if full_scan else sync_state.get("last_full_scan", "")
+    }
+    os.makedirs(channel_path, exist_ok=True)
+    cc_save_config(os.path.join(channel_path, SYNC_STATE_FILE), sync_state)
+
+
+def limit_resolution(resolution: str, limit: str) -> str:
+    num_resolution = int(''.join(filter(str.isdigit, resolution)))  # Extract number from first resolution
+    num_limit: int = 0
+    if limit!="max":
+        num_limit = int(''.join(filter(str.isdigit, limit)))  # Extract number from second resolution
+    if limit=="max" or num_resolution < num_limit:
+        max_resolution = resolution
+    else:
+        max_resolution = limit
+
+    return max_resolution
+
+
+def download_resolution(yt: YouTube) -> str:
+    res = max(print_resolutions(yt), key=lambda x: int(x.rstrip('p')))
+    if current_channel()["max_resolution"] != "max":
+        res = limit_resolution(res, current_channel()["max_resolution"])
+    return res
+
+
+def resolve_streams(yt: YouTube) -> tuple[str, dict]:
+    """Returns the resolution and the streams of a download (see select_streams), read through the rate
+    limiter. The resolution is the one of the selected video stream, it can be below the limit."""
+    def resolve() -> tuple[str, dict]:
+        res = download_resolution(yt)
+        output_format = select_streams(yt, res)
+        if output_format["video"] is not None:
+            res = output_format["video"].resolution
+        return res, output_format
+
+    return rate_limited(resolve)
+
+
+def resolve_download_job(video_id: str, video_filter: list) -> dict:
+    """Metadata of a video plus the estimated size of its download and whether it needs a transcode.
+
+    Used by the size based scheduling policies, only videos that pass the filters get their streams resolved.
+    The YouTube object is kept for the download (see keep_video_object).
+    """
+    metadata = get_video_metadata(video_id)
+    if not apply_video_filter(video_filter, metadata) or metadata["age_restricted"]:
+        return metadata
+    try:
+        yt = take_video_object(video_id) or YouTube(youtube_base_url + video_id)
+        keep_video_object(video_id, yt)
+        _, output_format = resolve_streams(yt)
+    except Exception:
+        return metadata  # the download finds out what's wrong, it's queued after the estimated ones
+    streams = [stream for stream in (output_format["video"], output_format["audio"]) if stream is not None]
+    return {**metadata, "estimated_bytes": sum(stream.filesize or 0 for stream in streams),
+            "transcode": output_format["action"] == "transcode"}
+
+
+def create_directories(restricted: bool, year: str) -> None:
+    channel = current_channel()
+    if restricted:
+        os.makedirs(channel["path"] + f"{str(year)}/restricted", exist_ok=True)
+    else:
+        os.makedirs(channel["path"] + f"{str(year)}", exist_ok=True)
+
+
+def download_video(channel_name: str, video_id: str, counter_id: int, video_total_count: int,
+                   restricted: bool) -> None:
+    channel = current_channel()
+    restricted_path_snippet = ""
+    colored_video_id = video_id
+    header_width = (header_width_global + 11)
+    metadata = get_video_metadata(video_id)
+    yt = take_video_object(video_id)
+    if restricted:
+        yt = rate_limited(YouTube, youtube_base_url + video_id, use_oauth=True, allow_oauth_cache=True)
+        restricted_path_snippet = "restricted/"
+        colored_video_id = print_colored_text(video_id, BCOLORS.RED)
+        header_width = (header_width_global + 20)
+    elif yt is None:
+        yt = YouTube(youtube_base_url + video_id)
+
+    print("\n")
+    print(format_header(colored_video_id + " - " + channel_name
+                         + " - " + str(counter_id) + "/" + str(video_total_count), header_width))
+
+    publishing_date = metadata["publish_date"]
+
+    if channel["year_subfolders"]:
+        year = "/" + publishing_date[:4]
+    else:
+        year = ""
+
+    res, output_format = resolve_streams(yt)
+
+    print_video_infos(yt, metadata, res)
+    if not channel["audio_only"]:
+        print(print_colored_text("Format:" + " " * (first_column_width - len("Format:")), BCOLORS.BLACK),
+              print_colored_text(describe_output_format(output_format), BCOLORS.BLACK))
+
+    if link_archived_variant(video_id, res, year, restricted):
+        return
+
+    job_dir = job_directory(video_id)
+    journal = start_job_journal(job_dir, video_id, res, output_format["id"])
+
+    admission = admit_job(video_id, *estimate_job_space(output_format, journal))
+    if admission == "deferred":
+        print(print_colored_text("\nNot enough disk space yet, queued again after the waiting downloads\n",
+                                 BCOLORS.ORANGE))
+        submit_download(download_video, channel_name, video_id, counter_id, video_total_count, restricted,
+                        video_id=video_id)
+        return
+    if admission == "skipped":
+        record_failed_job(video_id, "not enough disk space for this video, skipped")
+        return
+
+    try:
+        download_admitted_video(yt, metadata, res, output_format, publishing_date, year, restricted, job_dir,
+                                journal)
+    except BaseException:
+        release_job_space(video_id)
+        raise
+
+
+def link_archived_variant(video_id: str, res: str, year: str, restricted: bool) -> bool:
+    """Looks the video up in the archive catalog, True if there's nothing to download.
+
+    res is the resolution of the selected video stream (see resolve_streams), not the limit of the channel.
+    A variant in the channel directory at res or better means the video is done, a variant like that in
+    another channel directory is reflinked (or hard linked) into the channel directory. Only a variant of a
+    lower resolution is upgraded, retire_replaced_variants() deletes it after the new video is written.
+    """
+    channel = current_channel()
+    kind = "mp3" if channel["audio_only"] else "video"
+    variants = [(path, entry) for path, entry in catalog_variants(video_id, kind, channel["path"])
+                if kind == "mp3" or resolution_height(entry["resolution"]) >= resolution_height(res)]
+    if any(path == channel["path"] for path, _ in variants):
+        print(print_colored_text(f"\n{'MP3' if kind == 'mp3' else 'Video'} already downloaded\n", BCOLORS.GREEN))
+        return True
+
+    restricted_path = "/restricted/" if restricted else "/"
+    for path, entry in variants:
+        source = os.path.join(path, entry["file"])
+        target = channel["path"] + str(year) + restricted_path + os.path.basename(entry["file"])
+        create_directories(restricted, year)
+        if os.path.exists(source) and link_archived_file(source, target):
+            archive_index_add(channel["path"], target, entry.get("codec", ""))
+            print(print_colored_text(f"\nLinked from {source}\n", BCOLORS.GREEN))
+            if kind == "video":
+                retire_replaced_variants(video_id, entry["resolution"])
+            return True
+    return False
+
+
+def download_admitted_video(yt: YouTube, metadata: dict, res: str, output_format: dict, publishing_date: str,
+                            year: str, restricted: bool, job_dir: str, journal: dict) -> None:
+    channel = current_channel()
+    video_id = yt.video_id
+    if channel["audio_only"] and not job_stage_file(journal, "audio") and can_stream_audio(output_format["audio"]):
+        # MP3 mode encodes while downloading, nothing but the MP3 touches the disk
+        video_title = clean_string_regex(metadata["title"])
+        try:
+            with stage_timer(video_id, "mp3_stream") as measurement:
+                measurement["bytes"] = output_format["audio"].filesize
+                stream_to_mp3(yt, output_format["audio"], video_title, video_id, publishing_date, year,
+                              restricted)
+            delete_temp_files(job_dir)
+            release_job_space(video_id)
+            return
+        except (OSError, http.client.HTTPException, subprocess.CalledProcessError, CorruptOutputError) as ee:
+            print(print_colored_text(f"\nStreaming to MP3 failed ({ee}), downloading the audio first",
+                                     BCOLORS.YELLOW))
+
+    if job_stage_file(journal, "audio") and (channel["audio_only"] or job_stage_file(journal, "video")):
+        print(print_colored_text("\nStreams still available!", BCOLORS.BLACK))
+        video_title = clean_string_regex(metadata["title"])
+        submit_postprocess(postprocess_video, job_stage_file(journal, "video"), job_stage_file(journal, "audio"),
+                           video_title, video_id, publishing_date, res, output_format, year, restricted,
+                           job_dir, journal, video_id=video_id)
+    else:
+        download_video_process(yt, res, output_format, publishing_date, year, restricted, job_dir, journal)
+
+
+def video_codec_family(stream) -> str:
+    codec = (stream.video_codec or "").split(".")[0]
+    return "vp9" if codec in ("vp09", "vp9") else codec
+
+
+def audio_bitrate(stream) -> int:
+    return int(''.join(filter(str.isdigit, str(stream.abr or ""))) or 0)
+
+
+def select_streams(yt: YouTube, res: str) -> dict:
+    """Picks the video and audio stream for a download and how they become the output file.
+
+    Streams that can be stream copied into the output container are preferred (avc1/av01 into mp4, vp9 into
+    mkv if allow_mkv_output is set), then the codec order of preferred_video_codecs, frame rate and bitrate.
+    A transcode to H.264 is only planned if no stream at the resolution can be copied. Without a stream at res
+    the highest resolution below it is used (the lowest one if all are above).
+    """
+    if current_channel()["audio_only"]:
+        audio_stream = select_audio_stream(yt, "mp3")
+        return {"video": None, "audio": audio_stream, "action": "convert", "container": "mp3",
+                "audio_copy": False, "id": f"mp3-{audio_stream.itag}"}
+
+    all_video_streams = list(yt.streams.filter(type='video'))
+    heights = {resolution_height(stream.resolution or "") for stream in all_video_streams}
+    fitting_heights = [height for height in heights if height <= resolution_height(res)]
+    height = max(fitting_heights) if fitting_heights else min(heights)
+    video_streams = [stream for stream in all_video_streams if resolution_height(stream.resolution or "") == height]
+    # adaptive (video only) streams first, they come in the highest quality
+    video_streams.sort(key=lambda stream: stream.includes_audio_track)
+
+    def output_container(stream) -> str | None:
+        codec = video_codec_family(stream)
+        if codec in COPYABLE_VIDEO_CODECS["mp4"] and stream.subtype == "mp4":
+            return "mp4"
+        if allow_mkv_output and codec in COPYABLE_VIDEO_CODECS["mkv"]:
+            return "mkv"
+        return None
+
+    def rank(stream) -> tuple:
+        codec = video_codec_family(stream)
+        codec_rank = preferred_video_codecs.index(codec) if codec in preferred_video_codecs else len(
+            preferred_video_codecs)
+        return (output_container(stream) is None, stream.includes_audio_track, codec_rank,
+                -(getattr(stream, "fps", 0) or 0), -(stream.bitrate or 0))
+
+    video_stream = min(video_streams, key=rank)
+    container = output_container(video_stream)
+    action = "copy"
+    if container is None:
+        action, container = "transcode", "mp4"
+    audio_stream = select_audio_stream(yt, container)
+    audio_copy = container == "mkv" or (audio_stream.audio_codec or "").startswith("mp4a")
+    return {"video": video_stream, "audio": audio_stream, "action": action, "container": container,
+            "audio_copy": audio_copy, "id": f"{video_stream.itag}+{audio_stream.itag}-{action}-{container}"}
+
+
+def select_audio_stream(yt: YouTube, container: str):
+    """Picks the best audio stream, AAC for mp4/mp3 output, Opus for mkv output."""
+    audio_streams = list(yt.streams.filter(only_audio=True))
+    preferred_codec = "opus" if container == "mkv" else "mp4a"
+    return min(audio_streams, key=lambda stream: (
+        not getattr(stream, "is_default_audio_track", True),
+        not (stream.audio_codec or "").startswith(preferred_codec),
+        -audio_bitrate(stream)))
+
+
+def describe_output_format(output_format: dict) -> str:
+    video_stream = output_format["video"]
+    audio_stream = output_format["audio"]
+    return (f"{video_codec_family(video_stream)}/{video_stream.subtype} {getattr(video_stream, 'fps', '')}fps + "
+            f"{(audio_stream.audio_codec or '').split('.')[0]} {audio_stream.abr} -> "
+            f"{output_format['action']} to {output_format['container']}")
+
+
+def download_video_process(yt: YouTube, res: str, output_format: dict, publishing_date: str, year: str,
+                           restricted: bool, job_dir: str, journal: dict) -> None:
+    streams = {}
+    video_file = job_stage_file(journal, "video")
+    audio_file = job_stage_file(journal, "audio")
+    if not current_channel()["audio_only"] and video_file is None:
+        video_stream = output_format["video"]
+        streams["video"] = (video_stream, "video." + video_stream.subtype)
+
+    if audio_file is None:
+        audio_stream = output_format["audio"]
+        streams["audio"] = (audio_stream, "audio." + ("m4a" if audio_stream.subtype == "mp4" else audio_stream.subtype))
+
+    # progress bars of parallel downloads would overwrite each other
+    progress_callback = None
+    if max_parallel_downloads == 1:
+        progress_callback = combined_progress([stream for stream, _ in streams.values()])
+        yt.register_on_progress_callback(progress_callback)
+
+    print(print_colored_text("\nDownloading " + " + ".join(kind.upper() for kind in streams) + "...", BCOLORS.BLACK))
+
+    # the adaptive streams of one video are fetched side by side
+    with ThreadPoolExecutor(max_workers=len(streams)) as stream_pool:
+        stream_downloads = {kind: stream_pool.submit(in_channel(download_job_stream), stream, job_dir, filename,
+                                                     progress_callback, journal, kind)
+                            for kind, (stream, filename) in streams.items()}
+    if "video" in stream_downloads:
+        video_file = stream_downloads["video"].result()
+    if "audio" in stream_downloads:
+        audio_file = stream_downloads["audio"].result()
+
+    video_title = clean_string_regex(get_video_metadata(yt.video_id)["title"])
+    submit_postprocess(postprocess_video, video_file, audio_file, video_title, yt.video_id, publishing_date, res,
+                       output_format, year, restricted, job_dir, journal, video_id=yt.video_id)
+
+
+def download_job_stream(stream, job_dir: str, filename: str, progress_callback, journal: dict, stage: str) -> str:
+    with stage_timer(os.path.basename(job_dir), stage) as measurement:
+        stream_file = download_stream(stream, job_dir, filename, progress_callback)
+        measurement["bytes"] = os.path.getsize(stream_file)
+    complete_job_stage(job_dir, journal, stage, stream_file)
+    return stream_file
+
+
+def combined_progress(streams: list):
+    """Returns an on_progress callback that shows one progress bar for several streams downloading at once."""
+    total_size = sum(stream.filesize for stream in streams)
+    received = {}
+    progress_lock = threading.Lock()
+
+    def on_combined_progress(stream, chunk: bytes, bytes_remaining: int) -> None:
+        with progress_lock:
+            received[stream.itag] = stream.filesize - bytes_remaining
+            if total_size > 0:
+                display_progress_bar(sum(received.values()), total_size)
+
+    return on_combined_progress
+
+
+def download_stream(stream, output_path: str, filename: str, progress_callback=None) -> str:
+    """Downloads a stream in resumable byte ranges, large streams over several connections."""
+    if getattr(stream, "is_sabr", False) or not stream.filesize:
+        return rate_limited(stream.download, output_path=output_path, filename=filename, skip_existing=False)
+
+    connections = download_connections if stream.filesize >= SEGMENTED_DOWNLOAD_MIN_SIZE else 1
+    on_chunk = None
+    if progress_callback is not None:
+        def on_chunk(chunk: bytes, bytes_remaining: int) -> None:
+            progress_callback(stream, chunk, bytes_remaining)
+    return segmented_download(stream.url, os.path.join(output_path, filename), stream.filesize, connections,
+                              on_chunk)
+
+
+def open_connection(url: str) -> tuple[http.client.HTTPConnection, str]:
+    parsed_url = urllib.parse.urlsplit(url)
+    connection_class = http.client.HTTPSConnection if parsed_url.scheme == "https" else http.client.HTTPConnection
+    request_path = parsed_url.path + ("?" + parsed_url.query if parsed_url.query else "")
+    return connection_class(parsed_url.netloc, timeout=30), request_path
+
+
+def fetch_segment(connection: http.client.HTTPConnection, url: str, request_path: str, start: int, end: int,
+                  file, on_data) -> int:
+    """Requests a byte range on a kept-alive connection, writes it at its offset, returns the next offset to fetch."""
+    connection.request("GET", request_path, headers={"Range": f"bytes={start}-{end}"})
+    response = connection.getresponse()
+    if response.status in THROTTLING_STATUS_CODES:
+        response.read()
+        raise ThrottledError(f"HTTP {response.status} for range {start}-{end} of {url}")
+    if response.status != 206:
+        response.read()
+        raise http.client.HTTPException(f"HTTP {response.status} for range {start}-{end} of {url}")
+    file.seek(start)
+    try:
+        while start <= end:
+            check_cancelled()
+            data = response.read(min(65536, end - start + 1))
+            if not data:
+                break
+            file.write(data)
+            on_data(data)
+            start += len(data)
+    except (OSError, http.client.HTTPException):
+        # a dropped connection keeps everything received so far, the caller continues from here
+        connection.close()
+    return start
+
+
+def fetch_range(connection: http.client.HTTPConnection, url: str, request_path: str, start: int, end: int,
+                file, on_data) -> int:
+    """fetch_segment through the shared rate limiter, feeds the measured throughput back into it."""
+    started = time.monotonic()
+    next_position = rate_limited(fetch_segment, connection, url, request_path, start, end, file, on_data)
+    rate_limiter.record_throughput(next_position - start, time.monotonic() - started)
+    return next_position
+
+
+def segmented_download(url: str, file_path: str, file_size: int, connections: int, on_chunk=None) -> str:
+    """Downloads a URL in byte ranges over several connections into a preallocated file.
+
+    Completed segments are recorded in a sidecar file next to the download, an interrupted download
+    continues with the missing segments. The sidecar is removed once the file is complete.
+    """
+    if file_size <= 0:
+        raise ValueError(f"unknown size, {url} can't be downloaded in segments")
+    sidecar_path = file_path + SEGMENTS_SIDECAR_SUFFIX
+    segments = [(start, min(start + SEGMENT_SIZE, file_size) - 1) for start in range(0, file_size, SEGMENT_SIZE)]
+    completed = set()
+    sidecar = cc_load_config(sidecar_path)
+    if sidecar.get("size") == file_size and os.path.exists(file_path) and os.path.getsize(file_path) == file_size:
+        completed = set(sidecar.get("completed", []))
+    else:
+        with open(file_path, "wb") as file:
+            file.truncate(file_size)
+        cc_save_config(sidecar_path, {"size": file_size, "completed": []})
+
+    pending = deque(index for index in range(len(segments)) if index not in completed)
+    state_lock = threading.Lock()
+    bytes_remaining = [file_size - sum(segments[index][1] - segments[index][0] + 1 for index in completed)]
+
+    def on_data(data: bytes) -> None:
+        with state_lock:
+            bytes_remaining[0] -= len(data)
+            remaining = bytes_remaining[0]
+        if on_chunk is not None:
+            on_chunk(data, remaining)
+
+    def segment_worker() -> None:
+        # every worker keeps its own connection alive for all segments it fetches
+        connection, request_path = open_connection(url)
+        try:
+            with open(file_path, "r+b") as file:
+                while True:
+                    with state_lock:
+                        if not pending:
+                            break
+                        index = pending.popleft()
+                    start, end = segments[index]
+                    position = start
+                    failures = 0
+                    while position <= end:
+                        try:
+                            next_position = fetch_range(connection, url, request_path, position, end, file, on_data)
+                        except (OSError, http.client.HTTPException):
+                            next_position = position
+                        if next_position <= end:
+                            failures += 1
+                            if failures > 3:
+                                raise http.client.HTTPException(f"range {start}-{end} of {url} failed repeatedly")
+                            connection.close()
+                            connection, request_path = open_connection(url)
+                        position = next_position
+                    file.flush()
+                    with state_lock:
+                        completed.add(index)
+                        cc_save_config(sidecar_path, {"size": file_size, "completed": sorted(completed)})
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=max(1, min(connections, len(pending)))) as segment_pool:
+        workers = [segment_pool.submit(segment_worker) for _ in range(max(1, min(connections, len(pending))))]
+    for worker in workers:
+        worker.result()
+
+    os.remove(sidecar_path)
+    return file_path
+
+
+def postprocess_video(video_file: str | None, audio_file: str | None, video_title: str, video_id: str,
+                      publishing_date: str, res: str, output_format: dict, year: str, restricted: bool,
+                      job_dir: str, journal: dict) -> None:
+    """Muxes/transcodes the downloaded streams of a job into the channel directory."""
+    channel = current_channel()
+    try:
+        input_bytes = sum(os.path.getsize(stream_file) for stream_file in (video_file, audio_file)
+                          if stream_file and os.path.exists(stream_file))
+        if channel["audio_only"]:
+            with stage_timer(video_id, "mp3") as measurement:
+                measurement["bytes"] = input_bytes
+                convert_m4a_to_mp3(audio_file, video_title, video_id, publishing_date, year, restricted)
+        else:
+            if output_format["action"] == "transcode":
+                restricted_string = "/"
+                if restricted:
+                    restricted_string = "/restricted/"
+                path = (channel["path"] + str(year) + restricted_string + publishing_date + " - " + res + " - "
+                        + video_title + " - " + video_id + ".mp4")
+                with stage_timer(video_id, "transcode") as measurement:
+                    measurement["bytes"] = input_bytes
+                    convert_webm_to_mp4(video_file, audio_file, path, video_id, year, restricted,
+                                        output_format["audio_copy"])
+            else:
+                with stage_timer(video_id, "merge") as measurement:
+                    measurement["bytes"] = input_bytes
+                    merge_video_audio(video_file, audio_file, video_title, video_id, publishing_date, res, year,
+                                      restricted, output_format["container"], output_format["audio_copy"],
+                                      video_codec_family(output_format["video"]))
+            retire_replaced_variants(video_id, res)
+        delete_temp_files(job_dir)
+    finally:
+        release_job_space(video_id)
+
+
+def existing_directory(path: str) -> str:
+    path = os.path.abspath(path)
+    while not os.path.exists(path):
+        path = os.path.dirname(path)
+    return path
+
+
+def cached_free_space(path: str) -> tuple[int, int]:
+    """Returns the device and the free bytes of the filesystem of a path, measured at most every few seconds."""
+    path = existing_directory(path)
+    device = os.stat(path).st_dev
+    with disk_space_condition:
+        measured = free_space_cache.get(device)
+        if measured is None or time.monotonic() - measured[0] > FREE_SPACE_CACHE_SECONDS:
+            measured = (time.monotonic(), shutil.disk_usage(path).free)
+            free_space_cache[device] = measured
+    return device, measured[1]
+
+
+def estimate_job_space(output_format: dict, journal: dict) -> tuple[int, int]:
+    """Returns the scratch and the output bytes a job needs at its peak, estimated from the stream sizes.
+
+    Streams of the job that are already downloaded need no more scratch space. In MP3 mode the audio
+    is counted as scratch even if it is streamed, the job may fall back to downloading it first.
+    """
+    channel = current_channel()
+    sizes = {"audio": output_format["audio"].filesize or 0}
+    if not channel["audio_only"]:
+        sizes["video"] = output_format["video"].filesize or 0
+    scratch_bytes = sum(size for stage, size in sizes.items() if not job_stage_file(journal, stage))
+    if channel["audio_only"]:
+        output_bytes = int(sizes["audio"] * MP3_SIZE_FACTOR)
+    elif output_format["action"] == "transcode":
+        output_bytes = int(sizes["video"] * TRANSCODE_SIZE_FACTOR) + sizes["audio"]
+    else:
+        output_bytes = sizes["video"] + sizes["audio"]
+    return scratch_bytes, output_bytes
+
+
+def admit_job(video_id: str, scratch_bytes: int, output_bytes: int) -> str:
+    """Reserves the disk space of a job on the scratch and the output filesystem until release_job_space.
+
+    Every filesystem keeps its headroom (min_scratch_free_gb, min_output_free_gb) on top of the space
+    reserved by running jobs. A job that doesn't fit returns "deferred" once if downloads are still queued,
+    they go first, otherwise it waits for running jobs to release their space. "skipped" is returned if
+    the job doesn't fit with no other job holding space, it would fail halfway through.
+    """
+    warned = False
+    with disk_space_condition:
+        while True:
+            scratch_device, scratch_free = cached_free_space(TEMP_DIRECTORY)
+            output_device, output_free = cached_free_space(current_channel()["path"])
+            free = {scratch_device: scratch_free, output_device: output_free}
+            needed = {scratch_device: 0, output_device: 0}
+            needed[scratch_device] += scratch_bytes
+            needed[output_device] += output_bytes
+            headroom = {scratch_device: 0, output_device: 0}
+            headroom[scratch_device] = max(headroom[scratch_device], min_scratch_free_gb * 1_073_741_824)
+            headroom[output_device] = max(headroom[output_device], min_output_free_gb * 1_073_741_824)
+
+            if all(free[device] - disk_reservations.get(device, 0) - needed[device] >= headroom[device]
+                   for device in needed):
+                for device, size in needed.items():
+                    disk_reservations[device] = disk_reservations.get(device, 0) + size
+                job_reservations[video_id] = needed
+                return "admitted"
+            if not job_reservations:
+                return "skipped"
+            if video_id not in deferred_jobs and any(not job.running() and not job.done() for job in download_jobs):
+                deferred_jobs.add(video_id)
+                return "deferred"
+            if not warned:
+                print(print_colored_text("\nWaiting for running jobs to free disk space...", BCOLORS.ORANGE))
+                warned = True
+            check_cancelled()
+            disk_space_condition.wait(FREE_SPACE_CACHE_SECONDS)
+
+
+def release_job_space(video_id: str) -> None:
+    with disk_space_condition:
+        for device, size in job_reservations.pop(video_id, {}).items():
+            disk_reservations[device] -= size
+        # the finished job changed the free space, the next check measures again
+        free_space_cache.clear()
+        disk_space_condition.notify_all()
+
+
+def start_pipeline() -> None:
+    """Creates the download stage and the post-processing stage with their own concurrency limits."""
+    global download_pool, postprocess_pool, postprocess_slots
+    download_pool = ThreadPoolExecutor(max_workers=max_parallel_downloads)
+    postprocess_pool = ThreadPoolExecutor(max_workers=max_parallel_postprocessing)
+    # bounded number of queued + running post-processing jobs, downloads block when it is exhausted
+    postprocess_slots = threading.BoundedSemaphore(max_parallel_postprocessing * 2)
+    download_jobs.clear()
+    postprocess_jobs.clear()
+    download_queues.clear()
+    queued_video_ids.clear()
+    deferred_jobs.clear()
+    pipeline_cancelled.clear()
+
+
+def record_failed_job(video_id: str, error) -> None:
+    """Counts a video that wasn't downloaded for the channel of the calling thread."""
+    print(print_colored_text(f"\n{video_id} failed: {error}", BCOLORS.RED))
+    with failed_jobs_lock:
+        failed_jobs.setdefault(current_channel()["sync_id"], {})[video_id] = str(error)
+
+
+def isolated_job(function, video_id: str):
+    """Wraps a pipeline job, a failure is recorded for its channel instead of ending the run. The job journal
+    stays in tmp/, the next run resumes the video."""
+    def run_isolated(*args):
+        try:
+            function(*args)
+        except Exception as ee:
+            if not pipeline_cancelled.is_set():
+                record_failed_job(video_id, ee)
+
+    return run_isolated
+
+
+def submit_download(func, *args, video_id: str, priority: tuple = (math.inf,)) -> None:
+    """Queues a download, the lowest priority of a channel runs first (default: after all queued ones)."""
+    channel = current_channel()
+    with download_queue_lock:
+        channel_queue = download_queues.setdefault(channel["sync_id"], {"jobs": [], "turns": 0,
+                                                                        "weight": channel["download_weight"]})
+        heapq.heappush(channel_queue["jobs"], (priority, next(download_sequence),
+                                               in_channel(isolated_job(func, video_id)), args))
+    download_jobs.append(download_pool.submit(run_next_download))
+
+
+def queue_video_once(channel_path: str, video_id: str) -> bool:
+    """False if another sync of this run already queued the video for the channel directory."""
+    with download_queue_lock:
+        if (channel_path, video_id) in queued_video_ids:
+            return False
+        queued_video_ids.add((channel_path, video_id))
+        return True
+
+
+def run_next_download() -> None:
+    """Runs the next queued download of the channel whose turn it is, channels take turns so a large
+    channel can't hold up the others."""
+    with download_queue_lock:
+        sync_id = next(iter(download_queues))
+        channel_queue = download_queues[sync_id]
+        _, _, func, args = heapq.heappop(channel_queue["jobs"])
+        channel_queue["turns"] += 1
+        if not channel_queue["jobs"]:
+            del download_queues[sync_id]
+        elif channel_queue["turns"] >= channel_queue["weight"]:
+            channel_queue["turns"] = 0
+            download_queues[sync_id] = download_queues.pop(sync_id)
+    func(*args)
+
+
+def job_priority(policy: str, video: dict, sequence: int) -> tuple:
+    """Sort key of a download under a scheduling policy, video is its metadata (see resolve_download_job)."""
+    if policy == "newest":
+        publish_date = video["publish_date"]
+        return (-date.fromisoformat(publish_date).toordinal() if publish_date else 0, sequence)
+    if policy == "shortest":
+        return (video["length"], sequence)
+    # videos without a stream estimate (restricted, streams unavailable) go after the estimated ones
+    size = (0, video["estimated_bytes"]) if "estimated_bytes" in video else (1, video["length"])
+    if policy == "smallest":
+        return (*size, sequence)
+    if policy == "remux_first":
+        return (video.get("transcode", False), *size, sequence)
+    return (sequence,)
+
+
+def submit_postprocess(func, *args, video_id: str) -> None:
+    postprocess_slots.acquire()
+    if pipeline_cancelled.is_set():
+        postprocess_slots.release()
+        check_cancelled()
+    job = postprocess_pool.submit(in_channel(isolated_job(func, video_id)), *args)
+    job.add_done_callback(lambda _: postprocess_slots.release())
+    postprocess_jobs.append(job)
+
+
+def wait_for_pipeline() -> None:
+    """Waits for all downloads and their post-processing, failed jobs are recorded in failed_jobs."""
+    for job in download_jobs:
+        job.result()
+    for job in postprocess_jobs:
+        job.result()
+    download_pool.shutdown()
+    postprocess_pool.shutdown()
+
+
+def cancel_pipeline() -> None:
+    """Stops the pipeline after Ctrl+C or an error: queued jobs are dropped, running downloads stop at their
+    next chunk, running ffmpeg processes are killed. Returns once all workers are done, the journals of the
+    stopped jobs stay in tmp/."""
+    pipeline_cancelled.set()
+    rate_limiter.interrupt()
+    with disk_space_condition:
+        disk_space_condition.notify_all()
+    with running_processes_lock:
+        for process in running_processes:
+            process.kill()
+    # cancelled post-processing jobs return their slots, downloads waiting for one go on and stop
+    postprocess_pool.shutdown(wait=False, cancel_futures=True)
+    download_pool.shutdown(cancel_futures=True)
+    postprocess_pool.shutdown()
+    pipeline_cancelled.clear()
+
+
+def check_cancelled() -> None:
+    if pipeline_cancelled.is_set():
+        raise PipelineCancelled("the run was cancelled")
+
+
+def start_process(command: list[str], **kwargs) -> subprocess.Popen:
+    """Starts an ffmpeg process of a job, cancel_pipeline() kills it."""
+    with running_processes_lock:
+        check_cancelled()
+        process = subprocess.Popen(command, **kwargs)
+        running_processes.add(process)
+    return process
+
+
+def finish_process(process: subprocess.Popen) -> None:
+    with running_processes_lock:
+        running_processes.discard(process)
+
+
+def run_process(command: list[str]) -> None:
+    """subprocess.run(command, check=True) for the ffmpeg processes of jobs, see start_process."""
+    process = start_process(command)
+    try:
+        if process.wait() != 0:
+            raise subprocess.CalledProcessError(process.returncode, command)
+    finally:
+        finish_process(process)
+
+
+def convert_m4a_to_mp3(audio_file: str, video_title: str, video_id: str, publish_date: str, year: str,
+                       restricted: bool) -> None:
+    channel = current_channel()
+    if not audio_file or not os.path.exists(audio_file):
+        print("❌ No M4A file found in the job directory.")
+        return
+
+    restricted_path = "/"
+    if restricted:
+        restricted_path = "/restricted/"
+
+    create_directories(restricted, year)
+    output_file = (channel["path"] + str(year) + restricted_path + publish_date +
+                   " - " + video_title + " - " + video_id + ".mp3")
+    partial_file = output_file + ".part"
+    print(print_colored_text("\nConverting to MP3...", BCOLORS.BLACK))
+    try:
+        command = [
+            "ffmpeg", "-y", "-loglevel", "quiet", "-stats",
+            "-i", audio_file,  # Input file
+            "-acodec", "libmp3lame",  # Use MP3 codec
+            "-q:a", "2",  # Quality setting (lower is better)
+            "-f", OUTPUT_MUXERS["mp3"], partial_file
+        ]
+        run_process(command)
+        finish_output(partial_file, output_file, video_id)
+        archive_index_add(channel["path"], output_file)
+
+    except BaseException:
+        # the job journal stays, the next run post-processes the streams again
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
+        raise
+
+    print(print_colored_text("\nMP3 downloaded\n", BCOLORS.GREEN))
+
+
+def probe_media_file(file_path: str, video_id: str) -> str | None:
+    """Checks a media file with ffprobe: readable, audio (and for videos video) stream, duration close to the
+    length in the metadata. Returns what's wrong, None if the file is fine or ffprobe isn't installed."""
+    command = ["ffprobe", "-v", "error", "-show_entries", "format=duration:stream=codec_type", "-of", "json",
+               file_path]
+    try:
+        result = subprocess.run(command, capture_output=True, text=True)
+    except FileNotFoundError:
+        return None
+    if result.returncode != 0:
+        return "unreadable: " + (result.stderr.strip().splitlines() or ["ffprobe failed"])[-1]
+
+    try:
+        probe = json.loads(result.stdout)
+        duration = float(probe["format"]["duration"])
+    except (ValueError, KeyError, TypeError):
+        return "no duration"
+    codec_types = {stream.get("codec_type") for stream in probe.get("streams", [])}
+    missing = [codec_type for codec_type in (("audio",) if file_path.endswith((".mp3", ".mp3.part"))
+                                             else ("video", "audio")) if codec_type not in codec_types]
+    if missing:
+        return "no " + "/".join(missing) + " stream"
+
+    length = (video_metadata.get(video_id) or cache_get("video", video_id)).get("length")
+    if length and abs(duration - int(length)) > max(DURATION_TOLERANCE_SECONDS,
+                                                    int(length) * DURATION_TOLERANCE_RATIO):
+        return f"duration {duration:.0f}s, the video is {length}s long"
+    return None
+
+
+def finish_output(partial_file: str, output_file: str, video_id: str) -> None:
+    """Renames a finished ffmpeg output to its final name if it passes probe_media_file(), a broken output is
+    deleted and raises CorruptOutputError."""
+    problem = probe_media_file(partial_file, video_id)
+    if problem:
+        os.remove(partial_file)
+        raise CorruptOutputError(f"{os.path.basename(output_file)}: {problem}")
+    os.replace(partial_file, output_file)
+
+
+def can_stream_audio(stream) -> bool:
+    return not getattr(stream, "is_sabr", False) and bool(stream.filesize)
+
+
+class PipeSink:
+    """File-like wrapper for fetch_segment that passes the bytes of consecutive ranges on to a pipe."""
+
+    def __init__(self, pipe):
+        self.pipe = pipe
+
+    def seek(self, offset: int) -> None:
+        pass  # ranges are requested in order, every range continues where the last one stopped
+
+    def write(self, data: bytes) -> None:
+        self.pipe.write(data)
+
+
+def stream_to_mp3(yt: YouTube, stream, video_title: str, video_id: str, publish_date: str, year: str,
+                  restricted: bool) -> None:
+    """Pipes the audio stream into ffmpeg while it downloads, only the finished MP3 is written to disk.
+
+    ffmpeg writes into a .part file which replaces the target once the encode succeeded, an interrupted
+    stream leaves no half-encoded MP3 in the archive.
+    """
+    channel = current_channel()
+    restricted_path = "/"
+    if restricted:
+        restricted_path = "/restricted/"
+
+    create_directories(restricted, year)
+    output_file = (channel["path"] + str(year) + restricted_path + publish_date +
+                   " - " + video_title + " - " + video_id + ".mp3")
+    partial_file = output_file + ".part"
+    print(print_colored_text("\nStreaming to MP3...", BCOLORS.BLACK))
+
+    progress_callback = None
+    if max_parallel_downloads == 1:
+        progress_callback = combined_progress([stream])
+    bytes_remaining = [stream.filesize]
+
+    def on_data(data: bytes) -> None:
+        bytes_remaining[0] -= len(data)
+        if progress_callback is not None:
+            progress_callback(stream, data, bytes_remaining[0])
+
+    command = [
+        "ffmpeg", "-y", "-loglevel", "quiet",
+        "-i", "pipe:0",  # audio stream bytes as they arrive
+        "-acodec", "libmp3lame",  # Use MP3 codec
+        "-q:a", "2",  # Quality setting (lower is better)
+        "-f", OUTPUT_MUXERS["mp3"], partial_file
+    ]
+    encoder = start_process(command, stdin=subprocess.PIPE)
+    sink = PipeSink(encoder.stdin)
+    connection, request_path = open_connection(stream.url)
+    try:
+        position = 0
+        failures = 0
+        while position < stream.filesize:
+            end = min(position + SEGMENT_SIZE, stream.filesize) - 1
+            try:
+                next_position = fetch_range(connection, stream.url, request_path, position, end, sink, on_data)
+            except (OSError, http.client.HTTPException):
+                next_position = position
+            if next_position <= end:
+                failures += 1
+                if failures > 3:
+                    raise http.client.HTTPException(f"range {position}-{end} of {stream.url} failed repeatedly")
+                connection.close()
+                connection, request_path = open_connection(stream.url)
+            else:
+                failures = 0
+            position = next_position
+        encoder.stdin.close()
+        if encoder.wait() != 0:
+            raise subprocess.CalledProcessError(encoder.returncode, command)
+    except BaseException:
+        encoder.kill()
+        encoder.wait()
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
+        raise
+    finally:
+        finish_process(encoder)
+        connection.close()
+
+    finish_output(partial_file, output_file, video_id)
+    archive_index_add(channel["path"], output_file)
+    print(print_colored_text("\nMP3 downloaded\n", BCOLORS.GREEN))
+
+
+def merge_video_audio(video_file: str, audio_file: str, video_title: str, video_id: str, publish_date: str,
+                      video_resolution: str, year: str, restricted: bool, container: str = "mp4",
+                      audio_copy: bool = False, codec: str = "") -> None:
+    channel = current_channel()
+    if not video_file or not audio_file:
+        print("❌ No video or audio stream files found in the job directory.")
+        return
+
+    restricted_path = "/"
+    if restricted:
+        restricted_path = "/restricted/"
+
+    create_directories(restricted, year)
+    output_file = (channel["path"] + str(year) + restricted_path + publish_date + " - " + video_resolution
+                   + " - " + video_title + " - " + video_id + "." + container)
+    partial_file = output_file + ".part"
+
+    try:
+        print(print_colored_text("\nMerging to " + container.upper() + "...", BCOLORS.BLACK))
+        command = [
+            "ffmpeg", "-y", "-loglevel", "quiet", "-stats", "-i", video_file, "-i", audio_file,
+            "-map", "0:v:0", "-map", "1:a:0",
+            "-c:v", "copy", "-c:a", "copy" if audio_copy else "aac", "-f", OUTPUT_MUXERS[container], partial_file
+        ]
+        run_process(command)
+        finish_output(partial_file, output_file, video_id)
+        archive_index_add(channel["path"], output_file, codec)
+
+        if restricted:
+            print(print_colored_text("\nRestricted Video downloaded\n", BCOLORS.GREEN))
+        else:
+            print(print_colored_text("\nVideo downloaded\n", BCOLORS.GREEN))
+
+    except BaseException:
+        # the job journal stays, the next run post-processes the streams again
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
+        raise
+
+
+def convert_webm_to_mp4(video_file: str, audio_file: str, output_file: str, video_id: str, year: str,
+                        restricted: bool, audio_copy: bool = False) -> None:
+    """Transcodes the raw WebM video and M4A audio streams into the final MP4 in a single ffmpeg pass."""
+    create_directories(restricted, year)
+    partial_file = output_file + ".part"
+    print(print_colored_text(f"\nConverting WebM to MP4... (this may take a while)", BCOLORS.BLACK))
+    command = [
+        "ffmpeg", "-y", "-loglevel", "quiet", "-stats", "-i", video_file, "-i", audio_file,
+        "-map", "0:v:0", "-map", "1:a:0",
+        "-c:v", "libx264", "-preset", "fast", "-crf", "23",  # H.264 video encoding
+        *(["-c:a", "copy"] if audio_copy else ["-c:a", "aac", "-b:a", "128k"]),  # AAC audio
+        "-movflags", "+faststart",  # Optimize MP4 for streaming
+        "-f", OUTPUT_MUXERS["mp4"], partial_file
+    ]
+    try:
+        run_process(command)
+    except BaseException:
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
+        raise
+    finish_output(partial_file, output_file, video_id)
+    archive_index_add(current_channel()["path"], output_file, "avc1")
+    if restricted:
+        print(print_colored_text("\nRestricted Video downloaded\n", BCOLORS.GREEN))
+    else:
+        print(print_colored_text("\nVideo downloaded\n", BCOLORS.GREEN))
+
+
+
+def load_app_config(config_path: str = "config.json") -> bool:
+    """Reads config.json into the module settings and fills in the defaults.
+
+    Returns False if keys are missing, they are added to the file to be filled in.
+    """
+    global output_dir, youtube_base_url, min_duration, max_duration, video_listing, default_audio_mp3
+    global max_parallel_downloads, max_parallel_metadata_fetches, use_metadata_cache, metadata_cache_ttl_hours
+    global metadata_cache_volatile_ttl_hours, metadata_cache_max_entries, incremental_sync, full_rescan_days
+    global max_parallel_postprocessing, min_scratch_free_gb, download_connections, preferred_video_codecs
+    global allow_mkv_output, show_latest_video_date, latest_upload_refresh_minutes, max_requests_per_second
+    global max_concurrent_requests, run_report, prometheus_textfile, min_output_free_gb, watch_interval_minutes
+    global scheduling_policy
+    config = load_config(config_path)
+    try:
+        # Access settings
+        output_dir = config["output_directory"]
+        youtube_base_url = config["youtube_base_url"]
+        min_duration = config["min_duration_in_minutes"]
+        max_duration = config["max_duration_in_minutes"]
+        video_listing = config["video_listing"]
+        default_audio_mp3 = config["default_audioMP3"]
+        max_parallel_downloads = config["max_parallel_downloads"]
+        max_parallel_metadata_fetches = config["max_parallel_metadata_fetches"]
+        use_metadata_cache = config["metadata_cache"]
+        metadata_cache_ttl_hours = config["metadata_cache_ttl_hours"]
+        metadata_cache_volatile_ttl_hours = config["metadata_cache_volatile_ttl_hours"]
+        metadata_cache_max_entries = config["metadata_cache_max_entries"]
+        incremental_sync = config["incremental_sync"]
+        full_rescan_days = config["full_rescan_days"]
+        max_parallel_postprocessing = config["max_parallel_postprocessing"]
+        min_scratch_free_gb = config["min_scratch_free_gb"]
+        min_output_free_gb = config["min_output_free_gb"]
+        download_connections = config["download_connections"]
+        preferred_video_codecs = config["preferred_video_codecs"]
+        allow_mkv_output = config["allow_mkv_output"]
+        show_latest_video_date = config["show_latest_video_date"]
+        latest_upload_refresh_minutes = config["latest_upload_refresh_minutes"]
+        max_requests_per_second = config["max_requests_per_second"]
+        max_concurrent_requests = config["max_concurrent_requests"]
+        run_report = config["run_report"]
+        prometheus_textfile = config["prometheus_textfile"]
+        watch_interval_minutes = config["watch_interval_minutes"]
+        scheduling_policy = config["scheduling_policy"]
+    except Exception as e:
+        print("An error occurred, incomplete config file:", str(e))
+        cc_check_and_update_channel_config(config_path, REQUIRED_APP_CONFIG)
+        return False
+
+    if max_parallel_downloads == "":
+        max_parallel_downloads = 1
+    max_parallel_downloads = max(1, int(max_parallel_downloads))
+    if max_parallel_metadata_fetches == "":
+        max_parallel_metadata_fetches = 8
+    max_parallel_metadata_fetches = max(1, int(max_parallel_metadata_fetches))
+    if use_metadata_cache == "":
+        use_metadata_cache = True
+    if metadata_cache_ttl_hours == "":
+        metadata_cache_ttl_hours = 720
+    metadata_cache_ttl_hours = float(metadata_cache_ttl_hours)
+    if metadata_cache_volatile_ttl_hours == "":
+        metadata_cache_volatile_ttl_hours = 24
+    metadata_cache_volatile_ttl_hours = float(metadata_cache_volatile_ttl_hours)
+    if metadata_cache_max_entries == "":
+        metadata_cache_max_entries = 100000
+    metadata_cache_max_entries = int(metadata_cache_max_entries)
+    if incremental_sync == "":
+        incremental_sync = True
+    if full_rescan_days == "":
+        full_rescan_days = 7
+    full_rescan_days = int(full_rescan_days)
+    if max_parallel_postprocessing == "":
+        max_parallel_postprocessing = os.cpu_count() or 1
+    max_parallel_postprocessing = max(1, int(max_parallel_postprocessing))
+    if min_scratch_free_gb == "":
+        min_scratch_free_gb = 5
+    min_scratch_free_gb = float(min_scratch_free_gb)
+    if min_output_free_gb == "":
+        min_output_free_gb = 1
+    min_output_free_gb = float(min_output_free_gb)
+    if download_connections == "":
+        download_connections = 4
+    download_connections = max(1, int(download_connections))
+    if preferred_video_codecs == "":
+        preferred_video_codecs = "avc1,av01,vp9"
+    preferred_video_codecs = string_to_list(preferred_video_codecs)
+    if allow_mkv_output == "":
+        allow_mkv_output = False
+    if show_latest_video_date == "":
+        show_latest_video_date = True
+    if latest_upload_refresh_minutes == "":
+        latest_upload_refresh_minutes = 60
+    latest_upload_refresh_minutes = float(latest_upload_refresh_minutes)
+    if max_requests_per_second == "":
+        max_requests_per_second = 10
+    max_requests_per_second = float(max_requests_per_second)
+    if max_concurrent_requests == "":
+        max_concurrent_requests = 16
+    max_concurrent_requests = max(1, int(max_concurrent_requests))
+    rate_limiter.configure(max_requests_per_second, max_concurrent_requests)
+    if run_report == "":
+        run_report = True
+    if watch_interval_minutes == "":
+        watch_interval_minutes = 15
+    watch_interval_minutes = float(watch_interval_minutes)
+    if scheduling_policy == "":
+        scheduling_policy = "listing"
+    if scheduling_policy not in SCHEDULING_POLICIES:
+        print(print_colored_text(f"Unknown scheduling_policy {scheduling_policy}, using listing", BCOLORS.RED))
+        scheduling_policy = "listing"
+    open_metadata_cache()
+    video_metadata.clear()
+    video_objects.clear()
+
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+    return True
+
+
+def resolve_target(target: str) -> tuple[str, str]:
+    """Returns the channel URL of a channel, video or playlist URL (or video ID) and the video IDs it names."""
+    import_pytubefix()
+    video_id_from_single_video = ""
+    if youtube_base_url in target:
+        video_id_from_single_video = pytubefix.extract.video_id(target)
+        target = get_video_metadata(video_id_from_single_video)["channel_url"]
+    elif "https://" not in target:
+        video_id_from_single_video = target
+        target = get_video_metadata(video_id_from_single_video)["channel_url"]
+    elif "list=" in target:
+        playlist_info = get_playlist_info(target)
+        target = playlist_info["owner_url"]
+        video_id_from_single_video = ",".join(playlist_info["video_ids"])
+    return target, video_id_from_single_video
+
+
+def load_channel_defaults(channel_path: str) -> dict:
+    """Returns the answer defaults of a channel, taken from its _config_channel.json if there is one."""
+    defaults = {
+        "c_max_resolution": "max",
+        "c_ignore_min_duration": "y",
+        "c_ignore_max_duration": "y",
+        "c_skip_restricted": "n",
+        "c_minimum_views": 0,
+        "c_year_subfolders": "n",
+        "c_exclude_video_ids": "",
+        "c_include_video_ids": "",
+        "c_filter_words": "",
+        "c_watch_interval_minutes": "",
+        "c_scheduling_policy": "",
+        "c_download_weight": 1
+    }
+    channel_config_path = channel_path + CHANNEL_CONFIG_FILE
+    if not os.path.exists(channel_config_path):
+        return defaults
+
+    # Load channel config
+    channel_config = load_config(channel_config_path)
+    incomplete_string = [key for key in REQUIRED_VIDEO_CHANNEL_CONFIG if key not in channel_config]
+    for key in REQUIRED_VIDEO_CHANNEL_CONFIG:
+        if channel_config.get(key, "") != "" or key in ("c_exclude_video_ids", "c_include_video_ids",
+                                                        "c_filter_words"):
+            defaults[key] = channel_config.get(key, defaults[key])
+
+    if incomplete_string:
+        print(print_colored_text("\nIncomplete ", BCOLORS.ORANGE)
+              + print_colored_text("channel config file! --> Adding missing key(s) to file ", BCOLORS.BLUE)
+              + print_colored_text(str(incomplete_string), BCOLORS.ORANGE))
+        cc_check_and_update_channel_config(channel_config_path, REQUIRED_VIDEO_CHANNEL_CONFIG)
+    else:
+        print(print_colored_text("\nChannel config file found! ", BCOLORS.BLUE) +
+              print_colored_text("\n" + channel_config_path, BCOLORS.BLACK))
+    return defaults
+
+
+def compile_video_filter(exclude_ids: list[str], include_ids: list[str], filter_words: list[str],
+                         min_minutes: int | None, max_minutes: int | None, min_views: int,
+                         skip_restricted: bool) -> list:
+    """Compiles the filters of a sync into (field, rule) pairs, cheapest first.
+
+    The ID rules only need the channel listing, title and length are cached for a long time, views,
+    playability and age restriction expire sooner and usually need a per-video fetch.
+    """
+    video_filter = []
+    if exclude_ids:
+        excluded = frozenset(clean_youtube_urls(exclude_ids))
+        video_filter.append(("video_id", lambda video: video["video_id"] not in excluded))
+    if include_ids:
+        included = frozenset(clean_youtube_urls(include_ids))
+        video_filter.append(("video_id", lambda video: video["video_id"] in included))
+    words = tuple(word.lower() for word in filter_words if word != "")
+    if words:
+        video_filter.append(("title", lambda video: any(word in video["title"].lower() for word in words)))
+    if min_minutes is not None:
+        video_filter.append(("length", lambda video: int(video["length"] / 60) >= min_minutes))
+    if max_minutes is not None:
+        video_filter.append(("length", lambda video: int(video["length"] / 60) <= max_minutes))
+    if min_views > 0:
+        video_filter.append(("views", lambda video: video["views"] >= min_views))
+    video_filter.append(("playability_status",
+                         lambda video: video["playability_status"] not in UNPLAYABLE_STATUSES))
+    if skip_restricted:
+        video_filter.append(("age_restricted", lambda video: not video["age_restricted"]))
+    return video_filter
+
+
+def apply_video_filter(video_filter: list, video: dict) -> bool | None:
+    """Returns False as soon as a rule rejects the video, None if rules need fields it doesn't have yet."""
+    passed = True
+    for field, rule in video_filter:
+        if field not in video:
+            passed = None
+        elif not rule(video):
+            return False
+    return passed
+
+
+def sync_channel(channel_url: str, download_path: str | None = None, audio_only: bool = False,
+                 max_resolution: str = "max", ignore_min_duration: bool = True, ignore_max_duration: bool = True,
+                 skip_restricted: bool = False, min_views: int = 0, use_year_subfolders: bool = False,
+                 exclude_ids: list[str] | None = None, include_ids: list[str] | None = None,
+                 filter_words: list[str] | None = None, dry_run: bool = False, scheduling: str | None = None,
+                 download_weight: int = 1, full_rescan: bool = False) -> dict:
+    """Downloads all videos of a channel that pass the filters and aren't archived yet.
+
+    This is the non-interactive core of YTDLa, load_app_config() has to be called first. With dry_run the
+    videos are only listed. scheduling is the order of the downloads (see SCHEDULING_POLICIES, default:
+    scheduling_policy of config.json), download_weight the share of the channel when several channels are
+    synced together, full_rescan lists the whole channel instead of stopping at the watermark of the last run.
+    Returns the channel name, download path, the IDs of the downloaded (or, in a dry
+    run, pending) videos and of the videos that failed (resumed by the next run).
+    """
+    return sync_channels([{"channel_url": channel_url, "download_path": download_path, "audio_only": audio_only,
+                           "max_resolution": max_resolution, "ignore_min_duration": ignore_min_duration,
+                           "ignore_max_duration": ignore_max_duration, "skip_restricted": skip_restricted,
+                           "min_views": min_views, "use_year_subfolders": use_year_subfolders,
+                           "exclude_ids": exclude_ids, "include_ids": include_ids, "filter_words": filter_words,
+                           "scheduling": scheduling, "download_weight": download_weight,
+                           "full_rescan": full_rescan}],
+                         dry_run)[0]
+
+
+def sync_channels(channel_arguments: list[dict], dry_run: bool = False) -> list[dict]:
+    """Syncs several channels at once, every dict holds the sync_channel arguments of one channel.
+
+    Up to MAX_PARALLEL_CHANNEL_LISTINGS channels are listed at the same time (one by one in a dry run, so
+    the listed videos of a channel stay together), a large backfill doesn't hold up the listing of the other
+    channels. The videos of all channels go into the same download and post-processing pools, channels take
+    turns in the download queue. A channel that can't be listed is reported and left out. Returns the
+    results of the channels that were synced.
+    """
+    if not dry_run:
+        start_pipeline()
+    syncs = []
+    listing_pool = ThreadPoolExecutor(max_workers=1 if dry_run else MAX_PARALLEL_CHANNEL_LISTINGS)
+    try:
+        listings = [(arguments, listing_pool.submit(queue_channel_sync, dry_run=dry_run, **arguments))
+                    for arguments in channel_arguments]
+        for arguments, listing in listings:
+            try:
+                syncs.append(listing.result())
+            except Exception as ee:
+                if len(channel_arguments) == 1:
+                    raise
+                print(print_colored_text(f"\nSkipping channel {arguments['channel_url']}: {ee}", BCOLORS.RED))
+        listing_pool.shutdown()
+
+        if not dry_run:
+            wait_for_pipeline()
+    except BaseException:
+        # Ctrl+C or an error: no listing or job of this run keeps going once this returns
+        pipeline_cancelled.set()
+        rate_limiter.interrupt()
+        listing_pool.shutdown(cancel_futures=True)
+        if not dry_run:
+            cancel_pipeline()
+        pipeline_cancelled.clear()
+        raise
+    for sync in syncs:
+        with failed_jobs_lock:
+            sync["failed"] = failed_jobs.pop(sync["channel"]["sync_id"], {})
+    if not dry_run:
+        for sync in syncs:
+            channel_context.settings = sync["channel"]
+            sync["video_ids"] = [video_id for video_id in sync["video_ids"] if video_id not in sync["failed"]]
+            sync["restricted_video_ids"] = [video_id for video_id in sync["restricted_video_ids"]
+                                            if video_id not in sync["failed"]]
+            finish_run_report(sync["channel"], len(sync["video_ids"]) + len(sync["restricted_video_ids"]),
+                              len(sync["failed"]))
+            if sync["sync_state"] is not None:
+                save_sync_state(sync["channel"]["path"], sync["sync_state"], sync["listed_video_ids"],
+                                sync["full_scan"], list(sync["failed"]), sync["settings"])
+    channel_context.settings = None
+    return [{"channel_name": sync["channel"]["name"], "download_path": sync["channel"]["path"],
+             "video_ids": sync["video_ids"], "restricted_video_ids": sync["restricted_video_ids"],
+             "failed_video_ids": list(sync["failed"])}
+            for sync in syncs]
+
+
+def queue_channel_sync(channel_url: str, download_path: str | None = None, audio_only: bool = False,
+                       max_resolution: str = "max", ignore_min_duration: bool = True,
+                       ignore_max_duration: bool = True, skip_restricted: bool = False, min_views: int = 0,
+                       use_year_subfolders: bool = False, exclude_ids: list[str] | None = None,
+                       include_ids: list[str] | None = None, filter_words: list[str] | None = None,
+                       dry_run: bool = False, scheduling: str | None = None, download_weight: int = 1,
+                       full_rescan: bool = False) -> dict:
+    """Lists a channel and queues the downloads of the videos that pass the filters, see sync_channels."""
+    import_pytubefix()
+    c = Channel(channel_url)
+    channel_name = get_channel_name(c)
+    channel = {
+        "name": channel_name,
+        "path": download_path or output_dir + "/" + clean_string_regex(channel_name).rstrip(),
+        "audio_only": audio_only,
+        "max_resolution": "max" if audio_only else max_resolution,
+        "ignore_min_duration": ignore_min_duration,
+        "ignore_max_duration": ignore_max_duration,
+        "skip_restricted": skip_restricted,
+        "min_views": int(min_views),
+        "year_subfolders": use_year_subfolders,
+        "scheduling_policy": scheduling if scheduling in SCHEDULING_POLICIES else scheduling_policy,
+        "download_weight": max(1, int(download_weight)),
+        "sync_id": next(sync_sequence)
+    }
+    channel_context.settings = channel
+    start_run_report(channel["sync_id"])
+    include_list = clean_youtube_urls(include_ids or [])
+    video_filter = compile_video_filter(exclude_ids or [], include_ids or [], filter_words or [],
+                                        None if ignore_min_duration else int(min_duration),
+                                        None if ignore_max_duration else int(max_duration),
+                                        channel["min_views"], skip_restricted)
+
+    with archive_index_lock:
+        load_archive_index(channel["path"])
+
+    count_total_videos = 0
+    count_ok_videos = 0
+    count_skipped = 0
+    count_filtered = 0
+    video_list = []
+    video_list_restricted = []
+
+    video_watch_urls = []
+    sync_state = None
+    settings = None
+    full_scan = True
+    listed_video_ids = []
+
+    if len(include_list) > 0:
+        for include in include_list:
+            video_watch_urls.append(youtube_base_url + include)
+    else:
+        sync_state = load_sync_state(channel["path"])
+        settings = sync_settings(channel, exclude_ids or [], filter_words or [])
+        full_scan = full_rescan or full_rescan_due(sync_state, settings)
+        watermark = set() if full_scan else set(sync_state["recent_video_ids"])
+        new_videos_text = "" if full_scan else " new"
+        print()
+        with stage_timer(None, "enumerate"):
+            for url in rate_limited_listing(lambda: c.video_urls):
+                # channel uploads are listed newest first, everything after the watermark was already processed
+                if url.video_id in watermark:
+                    break
+                count_total_videos += 1
+                if len(listed_video_ids) < SYNC_WATERMARK_SIZE:
+                    listed_video_ids.append(url.video_id)
+                if apply_video_filter(video_filter, {"video_id": url.video_id}) is not False:
+                    video_watch_urls.append(url.watch_url)
+                print(f"\rFetching " + str(count_total_videos) + new_videos_text + " videos", end="",
+                      flush=True)
+        # videos behind the watermark that the last run couldn't handle are tried again
+        listed_watch_urls = set(video_watch_urls)
+        for video_id in sync_state.get("retry_video_ids", []):
+            if youtube_base_url + video_id not in listed_watch_urls:
+                video_watch_urls.append(youtube_base_url + video_id)
+        print(f"\rTotal {count_total_videos}{new_videos_text} Video(s) by: \033[96m{channel_name}\033[0m", end="",
+              flush=True)
+        print("\n")
+
+    candidate_video_ids = []
+    for url in video_watch_urls:
+        only_video_id = pytubefix.extract.video_id(url)
+
+        if find_file_by_string(channel["path"], only_video_id, channel["max_resolution"],
+                               channel["audio_only"]) is not None:
+            count_ok_videos += 1
+            count_skipped += 1
+            print(print_colored_text(f"\rSkipping {count_skipped} Videos", BCOLORS.MAGENTA), end="", flush=True)
+            continue
+
+        # cached metadata decides most filters before anything is fetched
+        cached = cache_get("video", only_video_id)
+        cached["video_id"] = only_video_id
+        if apply_video_filter(video_filter, cached) is False:
+            count_filtered += 1
+            continue
+        if all(field in cached for field in REQUIRED_VIDEO_METADATA):
+            video_metadata[only_video_id] = cached
+        candidate_video_ids.append(only_video_id)
+    if count_filtered > 0:
+        print(print_colored_text(f"\n{count_filtered} Video(s) filtered out by cached metadata", BCOLORS.BLACK),
+              end="")
+
+    resolve = get_video_metadata
+    if channel["scheduling_policy"] in STREAM_SCHEDULING_POLICIES and not dry_run:
+        def resolve(video_id: str) -> dict:
+            return resolve_download_job(video_id, video_filter)
+
+    for only_video_id, video in prefetch_video_metadata(candidate_video_ids, resolve):
+        check_cancelled()
+        if "error" in video:
+            record_failed_job(only_video_id, video["error"])
+            continue
+
+        restricted = bool(video["age_restricted"])
+        if apply_video_filter(video_filter, video):
+            if not dry_run and not queue_video_once(channel["path"], only_video_id):
+                release_video_object(only_video_id)  # already queued by another sync of this run
+                continue
+            count_ok_videos += 1
+            if restricted:
+                video_list_restricted.append(only_video_id)
+            else:
+                video_list.append(only_video_id)
+            if dry_run:
+                release_video_object(only_video_id)
+                print(print_colored_text(f"\n{video['publish_date']} - {only_video_id} - {video['title']}",
+                                         BCOLORS.RED if restricted else BCOLORS.WHITE), end="")
+            else:
+                submit_download(download_video, clean_string_regex(channel_name).rstrip(), only_video_id,
+                                count_ok_videos, len(video_watch_urls), restricted, video_id=only_video_id,
+                                priority=job_priority(channel["scheduling_policy"], video, count_ok_videos))
+        else:
+            release_video_object(only_video_id)
+
+    return {"channel": channel, "video_ids": video_list, "restricted_video_ids": video_list_restricted,
+            "sync_state": sync_state, "settings": settings, "listed_video_ids": listed_video_ids,
+            "full_scan": full_scan}
+
+
+def print_run_result(result: dict, dry_run: bool = False) -> None:
+    count_this_run = len(result["video_ids"]) + len(result["restricted_video_ids"])
+    if result.get("failed_video_ids"):
+        print(print_colored_text(f"\n{len(result['failed_video_ids'])} video(s) failed, they are retried by the "
+                                 f"next run: {', '.join(result['failed_video_ids'])}", BCOLORS.RED))
+    if count_this_run == 0 and not result.get("failed_video_ids"):
+        print("\n\n" + print_colored_text("Nothing to do...\n\n", BCOLORS.GREEN))
+    elif dry_run:
+        print(print_colored_text(f"\n\nDry run, {count_this_run} video(s) would be downloaded\n", BCOLORS.GREEN))
+    else:
+        print(print_colored_text(f"\nDONE! Downloaded in this session: {count_this_run}", BCOLORS.GREEN))
+        print(f"\n{get_free_space(result['download_path'])} free\n")
+
+
+def interactive(config_path: str = "config.json") -> None:
+    """The interactive menu: select a channel, answer the filter questions (defaults from the channel
+    config) and download, until the user stops. config_path is the app config (--config)."""
+    while True:
+        try:
+            if not load_app_config(config_path):
+                continue
+            import_pytubefix()
+
+            clear_screen()
+            print(print_colored_text("\nYTDL " + str(version), BCOLORS.YELLOW))
+            print(print_colored_text("*" * len(str("YTDL " + str(version))), BCOLORS.YELLOW))
+            print(print_colored_text("YouTube Channel Downloader (Exit with Ctrl + C)", BCOLORS.BLACK))
+            print("")
+            delete_temp_files()
+            print_configuration(config_path)
+            print_unfinished_jobs()
+
+            lines = read_channel_txt_lines("channels.txt")
+            if lines and len(lines) > 1:
+                YTchannel = user_selection(lines, show_latest_video_date)
+            else:
+                YTchannel = input("\nYouTube Channel, Video-, or Playlist URL:  ")
+            if "- Enter YouTube Channel or Video URL -" in YTchannel:
+                YTchannel = input("\nYouTube Channel, Video-, or Playlist URL:  ")
+
+            YTchannel, video_id_from_single_video = resolve_target(YTchannel)
+
+            c = Channel(YTchannel)
+            channel_name = get_channel_name(c)
+            print("\n" + print_colored_text(print_colored_text(channel_name, BCOLORS.BOLD), BCOLORS.CYAN))
+            print(print_colored_text(print_colored_text("*" * len(channel_name), BCOLORS.BOLD), BCOLORS.CYAN))
+
+            print(print_colored_text(c.channel_url, BCOLORS.CYAN))
+
+            selected_video_ids = []
+
+            if video_listing:
+                list_all_videos = smart_input("\nList Videos? (page by page, restricted videos in "
+                                              + print_colored_text("red", BCOLORS.RED) + ")  Y/n", "y")
+
+                if list_all_videos == "y":
+                    selected_video_ids = list_channel_videos(c)
+
+            download_path = smart_input("\nDownload Path:" + " " * (first_column_width - len("Download Path:")),
+                                        output_dir + "/" + clean_string_regex(channel_name).rstrip())
+            defaults = load_channel_defaults(download_path)
+            default_include_videos = defaults["c_include_video_ids"]
+            if video_id_from_single_video != "":
+                default_include_videos = video_id_from_single_video
+
+            if default_audio_mp3:
+                default_value_mp3 = "a"
+            else:
+                default_value_mp3 = "v"
+            audio_or_video = smart_input("\nAudio or Video?  a/v", default_value_mp3)
+            audio_only = True
+            if audio_or_video == "v":
+                audio_only = False
+
+            if audio_only:
+                max_resolution = "max"
+            else:
+                max_resolution = smart_input("Max. Resolution:  ", defaults["c_max_resolution"])
+
+            ignore_min_duration = smart_input("Ignore min_duration?  Y/n", defaults["c_ignore_min_duration"])
+            ignore_min_duration_answer = True
+            if ignore_min_duration == "n":
+                ignore_min_duration_answer = False
+                print(print_colored_text("Ignoring Video(s) < " + str(min_duration) + " Minutes!", BCOLORS.RED))
+
+            ignore_max_duration = smart_input("Ignore max_duration?  Y/n", defaults["c_ignore_max_duration"])
+            ignore_max_duration_answer = True
+            if ignore_max_duration == "n":
+                ignore_max_duration_answer = False
+                print(print_colored_text("Ignoring Video(s) > " + str(max_duration) + " Minutes!", BCOLORS.RED))
+
+            skip_restricted_answer = False
+            skip_restricted = smart_input("Skip restricted Video(s)?  Y/n ", defaults["c_skip_restricted"])
+            if skip_restricted == "y":
+                skip_restricted_answer = True
+                print(print_colored_text("Skipping restricted Video(s)!", BCOLORS.RED))
+
+            min_views = int(smart_input("Minimum Views (0=disabled): ", defaults["c_minimum_views"]))
+
+            year_subfolders_answer = False
+            year_subfolders_temp = smart_input("Year sub folder structure?  Y/n", defaults["c_year_subfolders"])
+            if year_subfolders_temp == "y":
+                year_subfolders_answer = True
+                print(print_colored_text("Year sub folder structure active!", BCOLORS.RED))
+
+            exclude_video_ids = smart_input("\nExclude Video ID's (comma separated list): ",
+                                            defaults["c_exclude_video_ids"])
+            exclude_list = []
+            if exclude_video_ids != "":
+                exclude_list = string_to_list(exclude_video_ids)
+
+            if video_listing:
+                if len(selected_video_ids) > 0:
+                    default_include_videos = ",".join(selected_video_ids)
+            include_video_ids = smart_input("Include Video ID's (comma separated list): ", default_include_videos)
+            include_list = []
+            if include_video_ids != "":
+                include_list = string_to_list(include_video_ids)
+
+            video_name_filter = str(
+                smart_input("\nEnter filter word(s) (comma separated list): ", defaults["c_filter_words"]))
+            video_name_filter_list = string_to_list(video_name_filter)
+
+            full_rescan_answer = False
+            if incremental_sync and not include_list and load_sync_state(download_path):
+                full_rescan = smart_input("Full rescan (not only the uploads since the last run)?  y/N", "n")
+                full_rescan_answer = full_rescan == "y"
+
+            result = sync_channel(YTchannel, download_path, audio_only, max_resolution, ignore_min_duration_answer,
+                                  ignore_max_duration_answer, skip_restricted_answer, min_views,
+                                  year_subfolders_answer, exclude_list, include_list, video_name_filter_list,
+                                  scheduling=defaults["c_scheduling_policy"] or None,
+                                  full_rescan=full_rescan_answer)
+            print_run_result(result)
+
+            continue_ytdl = smart_input("Continue?  Y/n ", "y")
+            print("\n")
+            if continue_ytdl == "y":
+                continue
+            else:
+                break
+
+        except Exception as e:
+            print("An error occurred:", str(e))
+            continue_ytdl = smart_input("There was an exception. Continue?  Y/n ", "y")
+            print("\n")
+            if continue_ytdl == "y":
+                continue
+            else:
+                break
+
+        except KeyboardInterrupt:
+            continue_ytdl = smart_input("\n\nCtrl + C detected. Continue?  Y/n ", "y")
+            print("\n")
+            if continue_ytdl == "y":
+                continue
+            else:
+                break
+
+
+def print_unfinished_jobs() -> None:
+    unfinished_jobs = count_unfinished_jobs()
+    if unfinished_jobs > 0:
+        print(print_colored_text(f"{unfinished_jobs} unfinished job(s) in {TEMP_DIRECTORY}/, they are resumed when "
+                                 f"their video is selected again.\n", BCOLORS.ORANGE))
+
+
+def channel_sync_arguments(channel_url: str, download_path: str | None = None,
+                           options: argparse.Namespace | None = None, include_ids: str | None = None) -> dict:
+    """Returns the sync_channel arguments of a channel, options that aren't set come from its channel config."""
+    if download_path is None:
+        download_path = output_dir + "/" + clean_string_regex(get_channel_name(Channel(channel_url))).rstrip()
+    defaults = load_channel_defaults(download_path)
+
+    def option(name: str, default_key: str):
+        value = getattr(options, name, None)
+        return value if value is not None else defaults[default_key]
+
+    audio_only = getattr(options, "audio", None)
+    exclude_ids = option("exclude", "c_exclude_video_ids")
+    if getattr(options, "include", None) is not None:
+        include_ids = options.include
+    elif not include_ids:
+        include_ids = defaults["c_include_video_ids"]
+    return {"channel_url": channel_url, "download_path": download_path,
+            "audio_only": bool(default_audio_mp3 if audio_only is None else audio_only),
+            "max_resolution": option("max_resolution", "c_max_resolution"),
+            "ignore_min_duration": option("ignore_min_duration", "c_ignore_min_duration") in (True, "y"),
+            "ignore_max_duration": option("ignore_max_duration", "c_ignore_max_duration") in (True, "y"),
+            "skip_restricted": option("skip_restricted", "c_skip_restricted") in (True, "y"),
+            "min_views": int(option("min_views", "c_minimum_views")),
+            "use_year_subfolders": option("year_subfolders", "c_year_subfolders") in (True, "y"),
+            "exclude_ids": string_to_list(exclude_ids) if exclude_ids else [],
+            "include_ids": string_to_list(include_ids) if include_ids else [],
+            "filter_words": string_to_list(option("filter", "c_filter_words")),
+            "scheduling": option("scheduling", "c_scheduling_policy") or None,
+            "download_weight": int(defaults["c_download_weight"] or 1),
+            "full_rescan": bool(getattr(options, "full_rescan", False))}
+
+
+def command_download(args: argparse.Namespace) -> int:
+    """Non-interactive download of a channel, video or playlist, unset options come from the channel config."""
+    channel_url, named_video_ids = resolve_target(args.target)
+    arguments = channel_sync_arguments(channel_url, args.path, args, named_video_ids)
+    delete_temp_files()
+    result = sync_channel(dry_run=args.dry_run, **arguments)
+    print_run_result(result, args.dry_run)
+    return 0
+
+
+def command_batch(args: argparse.Namespace) -> int:
+    """Syncs every channel of channels.txt with the filters of its channel config, without questions."""
+    import_pytubefix()
+    channel_arguments = []
+    for line in read_channel_txt_lines(args.channels)[:-1]:
+        if line == "" or line.startswith("#"):
+            continue
+        try:
+            channel_url, named_video_ids = resolve_target(line)
+            channel_arguments.append(channel_sync_arguments(channel_url, options=args, include_ids=named_video_ids))
+        except Exception as ee:
+            print(print_colored_text(f"Skipping {line}: {ee}", BCOLORS.RED))
+    if not channel_arguments:
+        return 1
+    delete_temp_files()
+    for result in sync_channels(channel_arguments, args.dry_run):
+        print("\n" + print_colored_text(result["channel_name"], BCOLORS.CYAN), end="")
+        print_run_result(result, args.dry_run)
+    return 0
+
+
+def poll_new_uploads(channel_url: str, seen_video_ids: set) -> list[str]:
+    """Returns the uploads on the first page of a channel that aren't in seen_video_ids, newest first."""
+    ytchannel = Channel(channel_url)
+
+    def list_new_uploads() -> list[str]:
+        new_video_ids = []
+        for video in islice(ytchannel.videos_generator(), LATEST_UPLOAD_PAGE_SIZE):
+            if video.video_id in seen_video_ids:
+                break
+            new_video_ids.append(video.video_id)
+        return new_video_ids
+
+    return rate_limited(list_new_uploads)
+
+
+def watch_channels(channel_arguments: list[dict], intervals: list[float], max_polls: int | None = None) -> None:
+    """Polls the first page of every channel on its own interval (minutes) and downloads new uploads.
+
+    Uploads that are archived or in the channel's sync watermark count as seen, the seen IDs stay in memory.
+    The first polls are spread evenly over the interval, so the channels aren't all polled at once. New uploads
+    of the channels polled together are synced together, see sync_channels.
+    """
+    started = time.monotonic()
+    watched = []
+    for position, (arguments, interval) in enumerate(zip(channel_arguments, intervals)):
+        channel_path = arguments["download_path"]
+        seen_video_ids = set(load_sync_state(channel_path).get("recent_video_ids", []))
+        seen_video_ids.update(load_archive_index(channel_path)["videos"])
+        watched.append({"arguments": arguments, "interval": interval * 60, "seen": seen_video_ids,
+                        "next_poll": started + interval * 60 * position / len(channel_arguments)})
+
+    polls = 0
+    while max_polls is None or polls < max_polls:
+        now = time.monotonic()
+        due = [watch for watch in watched if watch["next_poll"] <= now]
+        if not due:
+            time.sleep(min(watch["next_poll"] for watch in watched) - now)
+            continue
+
+        new_uploads = []
+        for watch in due:
+            while watch["next_poll"] <= now:
+                watch["next_poll"] += watch["interval"]
+            arguments = watch["arguments"]
+            polls += 1
+            try:
+                new_video_ids = poll_new_uploads(arguments["channel_url"], watch["seen"])
+            except Exception as ee:
+                print(print_colored_text(f"{datetime.now():%H:%M:%S} {arguments['channel_url']}: {ee}", BCOLORS.RED))
+                continue
+            if new_video_ids:
+                print(print_colored_text(f"{datetime.now():%H:%M:%S} {len(new_video_ids)} new upload(s) in "
+                                         f"{arguments['download_path']}", BCOLORS.CYAN))
+                new_uploads.append((watch, new_video_ids))
+            if max_polls is not None and polls >= max_polls:
+                break
+
+        syncs = []
+        for watch, new_video_ids in new_uploads:
+            arguments = watch["arguments"]
+            # an include list in the channel config limits the channel to these videos, new uploads too
+            if arguments["include_ids"]:
+                included = set(clean_youtube_urls(arguments["include_ids"]))
+                new_video_ids = [video_id for video_id in new_video_ids if video_id in included]
+            if new_video_ids:
+                syncs.append(dict(arguments, include_ids=new_video_ids))
+        failed_video_ids = set()
+        if syncs:
+            try:
+                for result in sync_channels(syncs):
+                    print_run_result(result)
+                    failed_video_ids.update(result["failed_video_ids"])
+            except Exception as ee:
+                # nothing of this round counts as seen, the next poll tries the uploads again
+                print(print_colored_text(f"{datetime.now():%H:%M:%S} sync failed: {ee}", BCOLORS.RED))
+                continue
+        for watch, new_video_ids in new_uploads:
+            # failed downloads stay unseen, they are retried by the next poll
+            new_video_ids = [video_id for video_id in new_video_ids if video_id not in failed_video_ids]
+            watch["seen"].update(new_video_ids)
+            channel_path = watch["arguments"]["download_path"]
+            save_sync_state(channel_path, load_sync_state(channel_path), new_video_ids, False)
+
+
+def command_watch(args: argparse.Namespace) -> int:
+    """Keeps running and downloads new uploads of the channels in channels.txt as they appear."""
+    import_pytubefix()
+    channel_arguments = []
+    intervals = []
+    for line in read_channel_txt_lines(args.channels)[:-1]:
+        if line == "" or line.startswith("#"):
+            continue
+        try:
+            channel_url, _ = resolve_target(line)
+            arguments = channel_sync_arguments(channel_url)
+        except Exception as ee:
+            print(print_colored_text(f"Skipping {line}: {ee}", BCOLORS.RED))
+            continue
+        channel_interval = cc_load_config(arguments["download_path"] + CHANNEL_CONFIG_FILE).get(
+            "c_watch_interval_minutes", "")
+        channel_arguments.append(arguments)
+        intervals.append(args.interval or float(channel_interval or watch_interval_minutes))
+    if not channel_arguments:
+        return 1
+    delete_temp_files()
+    print(print_colored_text(f"\nWatching {len(channel_arguments)} channel(s), exit with Ctrl + C\n", BCOLORS.BLACK))
+    try:
+        watch_channels(channel_arguments, intervals, args.polls)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def command_list(args: argparse.Namespace) -> int:
+    """Prints the newest uploads of a channel, metadata is resolved concurrently for the listed videos only."""
+    import_pytubefix()
+    channel_url, _ = resolve_target(args.target)
+    uploads = (video.video_id for video in rate_limited_listing(Channel(channel_url).videos_generator)
+               if getattr(video, "video_id", None))
+    for video_id, metadata in prefetch_video_metadata(list(islice(uploads, args.limit))):
+        release_video_object(video_id)
+        if "error" in metadata:
+            print(f"{video_id}  unavailable ({metadata['error']})")
+        else:
+            print(f"{metadata['publish_date']}  {video_id}  {metadata['title']}")
+    return 0
+
+
+def verify_archive(channel_paths: list[str]) -> list[tuple[str, str, str, str]]:
+    """Checks every archived file of the channel directories with probe_media_file(), max_parallel_postprocessing
+    ffprobe processes at a time. Returns channel directory, video ID, file and problem of the broken files."""
+    files = [(channel_path, video_id, entry["file"]) for channel_path in channel_paths
+             for video_id, entries in load_archive_index(channel_path)["videos"].items() for entry in entries]
+    corrupt = []
+    with ThreadPoolExecutor(max_workers=max_parallel_postprocessing) as pool:
+        problems = pool.map(lambda file: probe_media_file(os.path.join(file[0], file[2]), file[1]), files)
+        for checked, ((channel_path, video_id, file), problem) in enumerate(zip(files, problems), 1):
+            if problem:
+                corrupt.append((channel_path, video_id, file, problem))
+                print(print_colored_text(f"\r{os.path.join(channel_path, file)}: {problem}", BCOLORS.RED))
+            print(f"\rChecked {checked}/{len(files)} files", end="", flush=True)
+    print("")
+    return corrupt
+
+
+def command_verify(args: argparse.Namespace) -> int:
+    """Checks the archived files with ffprobe, with --redownload broken files are moved aside and downloaded
+    again."""
+    if shutil.which("ffprobe") is None:
+        print(print_colored_text("ffprobe not found, it comes with ffmpeg", BCOLORS.RED))
+        return 2
+    channel_paths = [args.path.rstrip("/")] if args.path else catalog_channel_paths()
+    corrupt = verify_archive(channel_paths)
+    if not corrupt:
+        print(print_colored_text("All files OK\n", BCOLORS.GREEN))
+        return 0
+    print(print_colored_text(f"{len(corrupt)} broken file(s)\n", BCOLORS.RED))
+    if not args.redownload:
+        return 1
+
+    import_pytubefix()
+    queued = {}
+    for channel_path, video_id, file, _ in corrupt:
+        # the .corrupt file isn't an archived video anymore, so the download doesn't skip it
+        os.replace(os.path.join(channel_path, file), os.path.join(channel_path, file) + ".corrupt")
+        queued.setdefault((channel_path, file.endswith(".mp3")), []).append(video_id)
+    channel_arguments = []
+    for (channel_path, audio_only), video_ids in queued.items():
+        load_archive_index(channel_path)
+        try:
+            channel_url = get_video_metadata(video_ids[0])["channel_url"]
+            channel_arguments.append(channel_sync_arguments(channel_url, channel_path,
+                                                            argparse.Namespace(audio=audio_only),
+                                                            ",".join(video_ids)))
+        except Exception as ee:
+            print(print_colored_text(f"Skipping {channel_path}: {ee}", BCOLORS.RED))
+    if not channel_arguments:
+        return 1
+    delete_temp_files()
+    for result in sync_channels(channel_arguments, False):
+        print("\n" + print_colored_text(result["channel_name"], BCOLORS.CYAN), end="")
+        print_run_result(result)
+    return 0
+
+
+def command_status(args: argparse.Namespace) -> int:
+    """Prints the configuration and the unfinished jobs, without importing pytubefix."""
+    print_configuration(args.config)
+    print_unfinished_jobs()
+    return 0
+
+
+def optional_switch(parser: argparse.ArgumentParser, name: str, help_text: str) -> None:
+    parser.add_argument("--" + name, dest=name.replace("-", "_"), action=argparse.BooleanOptionalAction,
+                        default=None, help=help_text + " (default: channel config)")
+
+
+def build_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="YTDLa.py", description="YouTube channel downloader. Without a command "
+                                                                  "the interactive menu starts.")
+    parser.add_argument("--config", default="config.json", help="app config file (default: config.json)")
+    subparsers = parser.add_subparsers(dest="command")
+
+    download_parser = subparsers.add_parser("download", help="download a channel, video or playlist without "
+                                                             "questions")
+    download_parser.add_argument("target", help="channel, video or playlist URL, or a video ID")
+    download_parser.add_argument("--path", help="download directory (default: output_directory/<channel name>)")
+    download_parser.add_argument("--audio", action=argparse.BooleanOptionalAction, default=None,
+                                 help="MP3 instead of video (default: default_audioMP3)")
+    download_parser.add_argument("--max-resolution", help="e.g. 1080p or max (default: channel config)")
+    optional_switch(download_parser, "ignore-min-duration", "don't skip videos shorter than min_duration")
+    optional_switch(download_parser, "ignore-max-duration", "don't skip videos longer than max_duration")
+    optional_switch(download_parser, "skip-restricted", "skip age restricted videos")
+    optional_switch(download_parser, "year-subfolders", "year sub folder structure")
+    download_parser.add_argument("--min-views", type=int, help="minimum views, 0 = disabled")
+    download_parser.add_argument("--exclude", help="comma separated video IDs to exclude")
+    download_parser.add_argument("--include", help="comma separated video IDs, only these are downloaded")
+    download_parser.add_argument("--filter", help="comma separated title filter words")
+    download_parser.add_argument("--scheduling", choices=SCHEDULING_POLICIES,
+                                 help="download order (default: channel config, else scheduling_policy)")
+    download_parser.add_argument("--full-rescan", action="store_true",
+                                 help="list the whole channel, not only the uploads since the last run")
+    download_parser.add_argument("--dry-run", action="store_true", help="only list the videos to download")
+    download_parser.set_defaults(handler=command_download)
+
+    batch_parser = subparsers.add_parser("batch", help="sync all channels of channels.txt with their channel "
+                                                       "config, their downloads share one queue")
+    batch_parser.add_argument("--channels", default="channels.txt",
+                              help="file with one channel URL per line (default: channels.txt)")
+    batch_parser.add_argument("--full-rescan", action="store_true",
+                              help="list the whole channels, not only the uploads since the last run")
+    batch_parser.add_argument("--dry-run", action="store_true", help="only list the videos to download")
+    batch_parser.set_defaults(handler=command_batch)
+
+    watch_parser = subparsers.add_parser("watch", help="keep running and download new uploads of the channels in "
+                                                       "channels.txt")
+    watch_parser.add_argument("--channels", default="channels.txt",
+                              help="file with one channel URL per line (default: channels.txt)")
+    watch_parser.add_argument("--interval", type=float,
+                              help="minutes between polls of a channel (default: c_watch_interval_minutes of the "
+                                   "channel config, else watch_interval_minutes)")
+    watch_parser.add_argument("--polls", type=int, help="exit after this many channel polls")
+    watch_parser.set_defaults(handler=command_watch)
+
+    list_parser = subparsers.add_parser("list", help="list the newest uploads of a channel")
+    list_parser.add_argument("target", help="channel, video or playlist URL, or a video ID")
+    list_parser.add_argument("--limit", type=int, default=VIDEO_LISTING_PAGE_SIZE,
+                             help=f"number of uploads (default: {VIDEO_LISTING_PAGE_SIZE})")
+    list_parser.set_defaults(handler=command_list)
+
+    verify_parser = subparsers.add_parser("verify", help="check the archived files with ffprobe")
+    verify_parser.add_argument("--path", help="channel directory to check (default: all channel directories of "
+                                              "output_directory)")
+    verify_parser.add_argument("--redownload", action="store_true",
+                               help="move broken files aside (.corrupt) and download them again")
+    verify_parser.set_defaults(handler=command_verify)
+
+    status_parser = subparsers.add_parser("status", help="show the configuration and unfinished jobs")
+    status_parser.set_defaults(handler=command_status)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_argument_parser().parse_args(argv)
+    if args.command is None:
+        interactive(args.config)
+        return 0
+    if not load_app_config(args.config):
+        return 2
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())